@@ -5,9 +5,12 @@ from pathlib import Path
 
 from celery import Celery
 from celery.schedules import crontab
+from decouple import config
 from kombu import Exchange, Queue
 
 from src.tasks.certification import create_membership_certificate
+from src.tasks.errors import RetryableError
+from src.tasks.resilience import retry_policy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -17,9 +20,18 @@ app.conf.broker_pool_limit = 1
 
 app.conf.task_create_missing_queues = False
 
+# Renders are memory-heavy: take one message at a time per child and recycle
+# a child once its RSS crosses the threshold (KiB) after finishing a task.
+app.conf.worker_prefetch_multiplier = 1
+app.conf.worker_max_memory_per_child = config(
+    "WORKER_MAX_MEMORY_PER_CHILD", default=400_000, cast=int
+)
+
+# Used when the worker runs with --autoscale=max,min; see src/autoscale.py
+app.conf.worker_autoscaler = "src.autoscale:CertificationAutoscaler"
+
 default_exchange = Exchange("default", type="direct")
 certification_exchange = Exchange("certification", type="direct")
-dlx_exchange = Exchange("dlx", type="direct")
 
 
 queue_arguments = {
@@ -41,14 +53,14 @@ app.conf.task_queues = (
         routing_key="certification",
         queue_arguments=queue_arguments,
     ),
-    Queue(
-        "dlx",
-        exchange=dlx_exchange,
-        routing_key="dead",
-    ),
 )
+# The dead-letter queue (src.tasks.resilience.DLX_QUEUE) is declared by the
+# worker at startup and when dead-lettering, but never consumed: a worker
+# would drop the header-less messages dead_letter() publishes.
 
+app.conf.task_default_queue = "default"
 app.conf.task_default_exchange = "default" # type: ignore
+app.conf.task_default_routing_key = "default"
 
 app.conf.task_routes = {
     "certification.*": {
@@ -65,26 +77,27 @@ app.conf.beat_schedule = {
     }
 }
 
+def custom_backoff(retries: int) -> float:
+    delay = min(2 ** retries, 60)
+    jitter = random.uniform(0, delay * 0.3)
+    return delay + jitter
+
+
 @app.task(bind=True, max_retries=5)
 def custom_retry_task(self):
-    try:
-        raise Exception("fail")
-    except Exception as exc:
-        delay = min(2 ** self.request.retries, 60)
-        jitter = random.uniform(0, delay * 0.3)
-        raise self.retry(exc=exc, countdown=delay + jitter)
+    with retry_policy(self, countdown=custom_backoff):
+        raise RetryableError("fail")
 
 
 @app.task(
     bind=True,
-    autoretry_for=(Exception,),
-    retry_backoff=True,
+    max_retries=5,
     retry_backoff_max=60,
-    retry_jitter=True,
-    retry_kwargs={"max_retries": 5},
+    retry_budget=0.2,
 )
 def resilient_task(self):
     print(f"Attempt {self.request.retries + 1}")
-    raise Exception("Temporary failure")
+    with retry_policy(self):
+        raise RetryableError("Temporary failure")
 
 create_membership_certificate(app)
@@ -1,3 +1,15 @@
 #!/usr/bin/env python3
+from typing import TYPE_CHECKING, Any
 
-from src.db import get_session
\ No newline at end of file
+if TYPE_CHECKING:
+    from src.db import get_session
+
+
+def __getattr__(name: str) -> Any:
+    # Resolved on first access so that importing a task module does not pull
+    # sqlmodel/SQLAlchemy into processes that never touch the database.
+    if name == "get_session":
+        from src.db import get_session
+
+        return get_session
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+import os
+import math
+import time
+import threading
+from collections import Counter
+from typing import Any, NamedTuple
+
+from celery.utils.log import get_logger
+from celery.worker import state
+from celery.worker.autoscale import Autoscaler
+from decouple import Csv, config
+
+from src.tasks.memory import available_memory_bytes
+
+
+logger = get_logger(__name__)
+
+AUTOSCALE_QUEUES: list[str] = config(
+    "AUTOSCALE_QUEUES", default="2025_certification", cast=Csv()
+)
+# Seconds between scaling decisions
+AUTOSCALE_INTERVAL: float = config("AUTOSCALE_INTERVAL", default=5.0, cast=float)
+# Backlog should drain within this many seconds; half the queue's 10 minute TTL
+AUTOSCALE_TARGET_LATENCY: float = config(
+    "AUTOSCALE_TARGET_LATENCY", default=300.0, cast=float
+)
+AUTOSCALE_UP_STEP: int = config("AUTOSCALE_UP_STEP", default=4, cast=int)
+AUTOSCALE_DOWN_STEP: int = config("AUTOSCALE_DOWN_STEP", default=1, cast=int)
+# Consecutive decisions that must agree before the pool shrinks
+AUTOSCALE_DOWN_TICKS: int = config("AUTOSCALE_DOWN_TICKS", default=3, cast=int)
+# Fraction of CPU that must be idle for the pool to grow
+AUTOSCALE_MIN_CPU_HEADROOM: float = config(
+    "AUTOSCALE_MIN_CPU_HEADROOM", default=0.1, cast=float
+)
+# Seconds a fork waits for an in-progress sample to finish
+FORK_SAMPLE_WAIT = 2.0
+
+
+class Observation(NamedTuple):
+    """Broker and host readings taken off the event loop."""
+
+    queue_depth: int | None
+    cpu_headroom: float
+    memory_available: int | None
+
+
+class Sample(NamedTuple):
+    processes: int
+    busy: int
+    queue_depth: int | None
+    throughput: float
+    cpu_headroom: float
+    memory_available: int | None
+
+
+class Decision(NamedTuple):
+    target: int
+    reason: str
+
+
+class ScalingPolicy:
+    """
+    Decides the pool size from queue depth, drain rate and host headroom.
+
+    The target is the number of processes that would drain the visible
+    backlog within `target_latency` at the measured per-process throughput.
+    Growth is capped by CPU headroom, by memory headroom at
+    `memory_per_process` bytes a child (when set) and by `up_step` per
+    decision. Shrinking waits for `down_ticks` consecutive decisions below
+    the current size and then removes at most `down_step` processes.
+    """
+
+    def __init__(
+        self,
+        min_procs: int,
+        max_procs: int,
+        target_latency: float = AUTOSCALE_TARGET_LATENCY,
+        up_step: int = AUTOSCALE_UP_STEP,
+        down_step: int = AUTOSCALE_DOWN_STEP,
+        down_ticks: int = AUTOSCALE_DOWN_TICKS,
+        min_cpu_headroom: float = AUTOSCALE_MIN_CPU_HEADROOM,
+        memory_per_process: int | None = None,
+    ):
+        self.min_procs = min_procs
+        self.max_procs = max_procs
+        self.target_latency = target_latency
+        self.up_step = up_step
+        self.down_step = down_step
+        self.down_ticks = down_ticks
+        self.min_cpu_headroom = min_cpu_headroom
+        self.memory_per_process = memory_per_process
+        self._below = 0
+
+    def demand(self, sample: Sample) -> tuple[int, str]:
+        """Processes needed for the current load, before limits and hysteresis."""
+        if sample.queue_depth is None:
+            return sample.busy, "queue depth unavailable, sizing to busy processes"
+        if sample.queue_depth == 0:
+            return sample.busy, "queue empty"
+        if sample.throughput <= 0 or sample.processes == 0:
+            return sample.processes + self.up_step, "backlog with no measured throughput"
+        per_process = sample.throughput / sample.processes
+        needed = math.ceil(sample.queue_depth / (per_process * self.target_latency))
+        latency = sample.queue_depth / sample.throughput
+        return max(needed, sample.busy), f"estimated drain time {latency:.0f}s"
+
+    def decide(self, sample: Sample, can_shrink: bool = True) -> Decision:
+        """
+        Picks the pool size for `sample`.
+
+        With `can_shrink` false (the pool grew within the keepalive) a lower
+        target is held without counting towards `down_ticks`.
+        """
+        current = sample.processes
+        wanted, reason = self.demand(sample)
+        target = min(max(wanted, self.min_procs), self.max_procs)
+
+        if target > current:
+            self._below = 0
+            if sample.cpu_headroom < self.min_cpu_headroom:
+                return Decision(current, f"{reason}; held, CPU headroom {sample.cpu_headroom:.0%}")
+            if sample.memory_available is not None and self.memory_per_process:
+                affordable = sample.memory_available // self.memory_per_process
+                if affordable < target - current:
+                    target = current + affordable
+                    reason += f"; capped by memory to {target}"
+            return Decision(min(target, current + self.up_step), reason)
+
+        if target < current:
+            if not can_shrink:
+                return Decision(current, f"{reason}; held, scaled up recently")
+            self._below += 1
+            if self._below < self.down_ticks:
+                return Decision(current, f"{reason}; hysteresis {self._below}/{self.down_ticks}")
+            self._below = 0
+            return Decision(max(target, current - self.down_step), reason)
+
+        self._below = 0
+        return Decision(current, reason)
+
+
+def cpu_headroom() -> float:
+    """Idle CPU fraction estimated from the 1-minute load average."""
+    try:
+        load = os.getloadavg()[0]
+    except OSError:
+        return 1.0
+    return max(1.0 - load / (os.cpu_count() or 1), 0.0)
+
+
+class CertificationAutoscaler(Autoscaler):
+    """
+    Celery autoscaler for the certification queues.
+
+    Enabled with `worker_autoscaler` and `--autoscale=max,min`. A sampler
+    thread reads queue depth (over one long-lived broker connection) and
+    host headroom every AUTOSCALE_INTERVAL seconds; the worker resizes the
+    pool from the latest reading per ScalingPolicy on the same interval,
+    whether or not messages arrive. The pool never shrinks within the
+    keepalive of growing. Decisions are logged, sent as `worker-autoscale`
+    events when events are enabled, and reported under "autoscaler" in
+    `celery inspect stats`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A child may grow to the recycle threshold (KiB) before it is replaced
+        max_memory_per_child = self.worker.app.conf.worker_max_memory_per_child
+        self.policy = ScalingPolicy(
+            self.min_concurrency,
+            self.max_concurrency,
+            memory_per_process=(
+                max_memory_per_child * 1024 if max_memory_per_child else None
+            ),
+        )
+        self.queues = AUTOSCALE_QUEUES
+        self.interval = AUTOSCALE_INTERVAL
+        self._last_sample_at = time.monotonic()
+        self._last_processed = self._processed()
+        self._throughput = 0.0
+        self.observation: Observation | None = None
+        self.last_sample: Sample | None = None
+        self.last_decision: Decision | None = None
+        self.decisions: Counter[str] = Counter()
+        self._connection = None
+        self._sampler: threading.Thread | None = None
+        self._stop_sampling = threading.Event()
+        # Held while sampling; forks wait for it so a child never starts
+        # with a sample in progress (and its locks held) in the parent
+        self._sampling = threading.Lock()
+        self._fork_locked = False
+        os.register_at_fork(
+            before=self._before_fork,
+            after_in_parent=self._after_fork_in_parent,
+            after_in_child=self._after_fork_in_child,
+        )
+        if self.worker is not None and getattr(self.worker, "use_eventloop", False):
+            # The event loop otherwise only scales on task messages and every
+            # keepalive; the hub runs the worker's timer
+            self.worker.timer.call_repeatedly(self.interval, self.maybe_scale)
+
+    def _processed(self) -> int:
+        return sum(state.total_count.values())
+
+    def queue_depth(self) -> int | None:
+        try:
+            if self._connection is None:
+                self._connection = self.worker.app.connection_for_read()
+            channel = self._connection.default_channel
+            return sum(
+                channel.queue_declare(queue=queue, passive=True).message_count
+                for queue in self.queues
+            )
+        except Exception as exc:
+            logger.warning(f"Autoscaler could not read queue depth: {exc}")
+            self._close_connection()
+            return None
+
+    def _close_connection(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def observe(self) -> Observation:
+        return Observation(
+            queue_depth=self.queue_depth(),
+            cpu_headroom=cpu_headroom(),
+            memory_available=available_memory_bytes(),
+        )
+
+    def start_sampling(self) -> None:
+        """
+        Starts the sampler thread, on the first scaling check.
+
+        The thread keeps running while the pool forks children (scale up,
+        max-memory recycling). Forks wait for an in-progress sample, and
+        children drop the inherited broker connection without closing it.
+        """
+        if self._sampler is None:
+            self._sampler = threading.Thread(
+                target=self._sample_forever, name="AutoscaleSampler", daemon=True
+            )
+            self._sampler.start()
+
+    def stop_sampling(self) -> None:
+        self._stop_sampling.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def stop(self) -> None:
+        self.stop_sampling()
+        super().stop()
+
+    def _sample_forever(self) -> None:
+        try:
+            while True:
+                with self._sampling:
+                    self.observation = self.observe()
+                if self._stop_sampling.wait(self.interval):
+                    break
+        finally:
+            self._close_connection()
+
+    def _before_fork(self) -> None:
+        # Bounded so a hung broker read never stalls the pool for long
+        self._fork_locked = self._sampling.acquire(timeout=FORK_SAMPLE_WAIT)
+
+    def _after_fork_in_parent(self) -> None:
+        if self._fork_locked:
+            self._fork_locked = False
+            self._sampling.release()
+
+    def _after_fork_in_child(self) -> None:
+        if self._fork_locked:
+            self._fork_locked = False
+            self._sampling.release()
+        # The socket is the parent's; closing it here would close the
+        # parent's AMQP session
+        self._connection = None
+        self._sampler = None
+
+    def sample(self, observation: Observation) -> Sample:
+        now = time.monotonic()
+        processed = self._processed()
+        elapsed = now - self._last_sample_at
+        if elapsed > 0:
+            rate = (processed - self._last_processed) / elapsed
+            # Smooth over a few intervals so one slow render doesn't swing the pool
+            self._throughput = 0.5 * self._throughput + 0.5 * rate
+        self._last_sample_at = now
+        self._last_processed = processed
+        return Sample(
+            processes=self.processes,
+            busy=len(state.active_requests),
+            queue_depth=observation.queue_depth,
+            throughput=self._throughput,
+            cpu_headroom=observation.cpu_headroom,
+            memory_available=observation.memory_available,
+        )
+
+    def can_shrink(self) -> bool:
+        """Whether the keepalive since the pool last grew has passed."""
+        return (
+            self._last_scale_up is None
+            or time.monotonic() - self._last_scale_up > self.keepalive
+        )
+
+    def _maybe_scale(self, req=None) -> bool:
+        # Runs on the event loop for every task message: only reads the
+        # sampler's latest observation, never the broker
+        self.start_sampling()
+        observation = self.observation
+        if observation is None or time.monotonic() - self._last_sample_at < self.interval:
+            return False
+        sample = self.sample(observation)
+        decision = self.policy.decide(sample, can_shrink=self.can_shrink())
+
+        if decision.target > sample.processes:
+            self.scale_up(decision.target - sample.processes)
+        elif decision.target < sample.processes:
+            self.scale_down(sample.processes - decision.target)
+            if self.processes > decision.target:
+                # The pool only stops idle processes
+                decision = Decision(self.processes, f"{decision.reason}; processes busy")
+        action = self.record(sample, decision)
+        return action != "hold"
+
+    def scale_down(self, n):
+        # can_shrink() was checked before deciding; the base class would
+        # also refuse to shrink a pool that never grew
+        return self._shrink(n)
+
+    def record(self, sample: Sample, decision: Decision) -> str:
+        if decision.target > sample.processes:
+            action = "up"
+        elif decision.target < sample.processes:
+            action = "down"
+        else:
+            action = "hold"
+        self.decisions[action] += 1
+        self.last_sample = sample
+        self.last_decision = decision
+
+        if action != "hold":
+            logger.info(
+                f"Autoscale {action}: {sample.processes} -> {decision.target} "
+                f"({decision.reason})"
+            )
+        dispatcher = getattr(self.worker.consumer, "event_dispatcher", None)
+        if dispatcher is not None:
+            dispatcher.send(
+                "worker-autoscale",
+                action=action,
+                current=sample.processes,
+                target=decision.target,
+                reason=decision.reason,
+                queue_depth=sample.queue_depth,
+                throughput=sample.throughput,
+            )
+        return action
+
+    def info(self) -> dict[str, Any]:
+        info = super().info()
+        info["decisions"] = dict(self.decisions)
+        if self.last_sample is not None:
+            info["last_sample"] = self.last_sample._asdict()
+        if self.last_decision is not None:
+            info["last_decision"] = self.last_decision._asdict()
+        return info
@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
+from typing import TYPE_CHECKING, Iterator
+from contextlib import contextmanager
+
 from decouple import config
-from sqlmodel import Session
-from sqlalchemy.engine import create_engine
+
+if TYPE_CHECKING:
+    from sqlmodel import Session
 
 
-def get_session() -> Session:
+def get_session() -> "Session":
+    # sqlmodel and SQLAlchemy are imported here rather than at module level
+    # so that only processes that actually open a session pay for them.
+    from sqlmodel import Session
+    from sqlalchemy.engine import create_engine
+
     db_database: str = str(config("DB_DATABASE"))
     db_username: str = str(config("DB_USERNAME"))
     db_password: str = str(config("DB_PASSWORD"))
@@ -14,3 +23,23 @@ def get_session() -> Session:
         f"mysql+pymy://{db_username}:{db_password}@{db_host}:{db_port}/{db_database}"
     )
     return Session(engine)
+
+
+@contextmanager
+def guarded_session() -> Iterator["Session"]:
+    """
+    Yields a session through the DB circuit breaker.
+
+    Connection-level errors count against the breaker and surface as
+    DatabaseUnavailableError; while the circuit is open this raises
+    CircuitOpenError without touching the database. No task reads the
+    database yet; use this instead of get_session() when one does.
+    """
+    from sqlalchemy.exc import InterfaceError, OperationalError
+
+    from src.tasks.errors import DatabaseUnavailableError
+    from src.tasks.resilience import db_breaker
+
+    with db_breaker.guard((OperationalError, InterfaceError), DatabaseUnavailableError):
+        with get_session() as session:
+            yield session
@@ -0,0 +1,2 @@
+#!/usr/bin/env python3
+from src.jobs.tracker import JobTracker, job_tracker
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Bulk job tracking CLI.
+
+Usage:
+    python -m src.jobs create --total 50000      # prints the new job ID
+    python -m src.jobs progress <job_id> [--json]
+"""
+import sys
+import json
+import argparse
+
+from src.jobs.store import JobStore
+
+
+def format_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return "unknown"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.jobs", description="Bulk job tracking")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="Register a job and print its ID")
+    create.add_argument("--total", type=int, required=True, help="Number of tasks in the job")
+    create.add_argument("--job-id", default=None, help="Use this ID instead of a new UUID")
+
+    progress = commands.add_parser("progress", help="Show a job's progress")
+    progress.add_argument("job_id")
+    progress.add_argument("--json", action="store_true", help="Print progress as JSON")
+
+    args = parser.parse_args(argv)
+    store = JobStore()
+
+    if args.command == "create":
+        print(store.create(args.total, args.job_id))
+        return 0
+
+    job = store.progress(args.job_id)
+    if job is None:
+        print(f"Unknown job: {args.job_id}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(job._asdict()))
+        return 0
+
+    completed = job.succeeded + job.failed
+    print(f"Job {job.job_id}")
+    print(f"  completed:  {completed}" + (f" / {job.total}" if job.total else ""))
+    print(f"  succeeded:  {job.succeeded}")
+    print(f"  failed:     {job.failed}")
+    print(f"  pending:    {job.pending if job.pending is not None else 'unknown'}")
+    throughput = f"{job.throughput:.2f}/s" if job.throughput else "unknown"
+    print(f"  throughput: {throughput}")
+    print(f"  eta:        {format_seconds(job.eta)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
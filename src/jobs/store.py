@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+import time
+import uuid
+from pathlib import Path
+from typing import NamedTuple
+
+from decouple import config
+from sqlalchemy import Double, case, insert, update
+from sqlalchemy.engine import Connection, Engine, create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Field, Session, SQLModel
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+JOBS_DATABASE_URL: str = config(
+    "JOBS_DATABASE_URL", default=f"sqlite:///{BASE_DIR / 'jobs.sqlite3'}"
+)
+
+
+class Job(SQLModel, table=True):
+    """Aggregated counters for one bulk issuance run."""
+
+    job_id: str = Field(primary_key=True, max_length=64)
+    # 0 when the producer never registered the job size
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    # Epoch seconds
+    created_at: float = Field(default_factory=time.time, sa_type=Double)
+    first_completed_at: float | None = Field(default=None, sa_type=Double)
+    last_completed_at: float | None = Field(default=None, sa_type=Double)
+
+
+class JobCounts(NamedTuple):
+    """Completions for one job accumulated by a worker between flushes."""
+
+    succeeded: int
+    failed: int
+    first_completed_at: float
+    last_completed_at: float
+
+
+class JobProgress(NamedTuple):
+    job_id: str
+    total: int
+    succeeded: int
+    failed: int
+    pending: int | None
+    # Completions per second since the first one
+    throughput: float | None
+    # Seconds until the remaining tasks complete at the current throughput
+    eta: float | None
+
+    @classmethod
+    def from_job(cls, job: Job) -> "JobProgress":
+        completed = job.succeeded + job.failed
+        pending = max(job.total - completed, 0) if job.total else None
+        throughput = None
+        if job.first_completed_at is not None and job.last_completed_at is not None:
+            elapsed = job.last_completed_at - job.first_completed_at
+            if elapsed > 0:
+                throughput = completed / elapsed
+        eta = pending / throughput if pending is not None and throughput else None
+        return cls(
+            job.job_id,
+            job.total,
+            job.succeeded,
+            job.failed,
+            pending,
+            throughput,
+            eta,
+        )
+
+
+class JobStore:
+    """
+    Job counters in the jobs database (JOBS_DATABASE_URL).
+
+    Defaults to a local SQLite file; point it at the main database to share
+    counters between hosts. Every read and write touches a single row by
+    primary key.
+    """
+
+    def __init__(self, url: str = JOBS_DATABASE_URL, engine: Engine | None = None):
+        self.engine = engine or create_engine(url)
+        SQLModel.metadata.create_all(self.engine, tables=[Job.__table__])
+
+    def create(self, total: int, job_id: str | None = None) -> str:
+        """Registers a job of `total` tasks, or adds to it if it already exists."""
+        job_id = job_id or str(uuid.uuid4())
+        try:
+            self._create(job_id, total)
+        except IntegrityError:
+            # Registered concurrently by another producer; the row now exists
+            self._create(job_id, total)
+        return job_id
+
+    def _create(self, job_id: str, total: int) -> None:
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(Job).where(Job.job_id == job_id).values(total=Job.total + total)
+            )
+            if result.rowcount == 0:
+                conn.execute(
+                    insert(Job).values(job_id=job_id, total=total, created_at=time.time())
+                )
+
+    def apply(self, counts: dict[str, JobCounts]) -> None:
+        """Adds a batch of per-job completion counts in one transaction."""
+        try:
+            self._apply(counts)
+        except IntegrityError:
+            # Another worker created one of the rows first; the batch was
+            # rolled back as a whole, and every row exists now
+            self._apply(counts)
+
+    def _apply(self, counts: dict[str, JobCounts]) -> None:
+        with self.engine.begin() as conn:
+            for job_id, delta in counts.items():
+                if not self._increment(conn, job_id, delta):
+                    conn.execute(
+                        insert(Job).values(
+                            job_id=job_id,
+                            created_at=time.time(),
+                            succeeded=delta.succeeded,
+                            failed=delta.failed,
+                            first_completed_at=delta.first_completed_at,
+                            last_completed_at=delta.last_completed_at,
+                        )
+                    )
+
+    @staticmethod
+    def _increment(conn: Connection, job_id: str, delta: JobCounts) -> bool:
+        result = conn.execute(
+            update(Job)
+            .where(Job.job_id == job_id)
+            .values(
+                succeeded=Job.succeeded + delta.succeeded,
+                failed=Job.failed + delta.failed,
+                first_completed_at=case(
+                    (Job.first_completed_at.is_(None), delta.first_completed_at),
+                    (
+                        Job.first_completed_at > delta.first_completed_at,
+                        delta.first_completed_at,
+                    ),
+                    else_=Job.first_completed_at,
+                ),
+                last_completed_at=case(
+                    (Job.last_completed_at.is_(None), delta.last_completed_at),
+                    (
+                        Job.last_completed_at < delta.last_completed_at,
+                        delta.last_completed_at,
+                    ),
+                    else_=Job.last_completed_at,
+                ),
+            )
+        )
+        return result.rowcount > 0
+
+    def progress(self, job_id: str) -> JobProgress | None:
+        with Session(self.engine) as session:
+            job = session.get(Job, job_id)
+            return JobProgress.from_job(job) if job else None
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+import time
+import threading
+from typing import TYPE_CHECKING
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from celery.utils.log import get_task_logger
+from decouple import config
+
+if TYPE_CHECKING:
+    from src.jobs.store import JobStore
+    from src.tasks.resilience import CircuitBreaker
+
+
+logger = get_task_logger(__name__)
+
+JOBS_FLUSH_BATCH: int = config("JOBS_FLUSH_BATCH", default=100, cast=int)
+JOBS_FLUSH_INTERVAL: float = config("JOBS_FLUSH_INTERVAL", default=5.0, cast=float)
+
+
+class JobTracker:
+    """
+    Buffers per-job completion counts in this process and writes them to the
+    job store in batches.
+
+    A batch is flushed once `batch_size` completions are buffered, or
+    `flush_interval` seconds after the first one, whichever comes first.
+    Counts that fail to flush stay buffered and are retried once the jobs
+    breaker lets a probe through, but no sooner than `flush_interval`;
+    tracking never fails the task itself.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = JOBS_FLUSH_BATCH,
+        flush_interval: float = JOBS_FLUSH_INTERVAL,
+        store: "JobStore | None" = None,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._breaker: "CircuitBreaker | None" = None
+        self._store = store
+        self._pending: dict[str, list] = {}
+        self._buffered = 0
+        self._timer: threading.Timer | None = None
+        # Set after a failed flush: wait for the retry timer rather than
+        # flushing on every completion past batch_size
+        self._deferred = False
+        self._lock = threading.Lock()
+
+    @property
+    def breaker(self) -> "CircuitBreaker":
+        # Separate from the main DB breaker so a jobs store outage never
+        # pauses certificate rendering. Created on first use because
+        # src.tasks imports this module.
+        if self._breaker is None:
+            from src.tasks.resilience import CircuitBreaker
+
+            self._breaker = CircuitBreaker("jobs")
+        return self._breaker
+
+    @property
+    def store(self) -> "JobStore":
+        if self._store is None:
+            from src.jobs.store import JobStore
+
+            self._store = JobStore()
+        return self._store
+
+    def record(self, job_id: str | None, succeeded: bool) -> None:
+        if not job_id:
+            return
+        now = time.time()
+        with self._lock:
+            counts = self._pending.setdefault(job_id, [0, 0, now, now])
+            counts[0 if succeeded else 1] += 1
+            counts[3] = now
+            self._buffered += 1
+            due = self._buffered >= self.batch_size and not self._deferred
+            if not due:
+                self._arm(self.flush_interval)
+        if due:
+            self.flush()
+
+    def _arm(self, delay: float) -> None:
+        """Schedules a flush in `delay` seconds unless one is pending; call with the lock held."""
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _merge(self, pending: dict[str, list]) -> None:
+        for job_id, (succeeded, failed, first, last) in pending.items():
+            counts = self._pending.setdefault(job_id, [0, 0, first, last])
+            counts[0] += succeeded
+            counts[1] += failed
+            counts[2] = min(counts[2], first)
+            counts[3] = max(counts[3], last)
+            self._buffered += succeeded + failed
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, {}
+            self._buffered = 0
+            self._deferred = False
+        if not pending:
+            return
+
+        from sqlalchemy.exc import SQLAlchemyError
+
+        from src.jobs.store import JobCounts
+        from src.tasks.errors import CircuitOpenError, DatabaseUnavailableError
+
+        try:
+            with self.breaker.guard((SQLAlchemyError, OSError), DatabaseUnavailableError):
+                self.store.apply(
+                    {job_id: JobCounts(*counts) for job_id, counts in pending.items()}
+                )
+        except (DatabaseUnavailableError, CircuitOpenError) as exc:
+            logger.warning(f"Could not flush job counters, keeping them buffered: {exc}")
+            with self._lock:
+                self._merge(pending)
+                self._deferred = True
+                self._arm(max(self.flush_interval, self.breaker.remaining()))
+
+
+job_tracker = JobTracker()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def flush_job_counters(**kwargs) -> None:
+    job_tracker.flush()
@@ -1,3 +1,15 @@
 #!/usr/bin/env python3
-from ..db import get_session
+from typing import TYPE_CHECKING, Any
+
 from src.tasks.certification import create_membership_certificate
+
+if TYPE_CHECKING:
+    from ..db import get_session
+
+
+def __getattr__(name: str) -> Any:
+    if name == "get_session":
+        from ..db import get_session
+
+        return get_session
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
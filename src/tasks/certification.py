@@ -7,15 +7,100 @@ from tempfile import NamedTemporaryFile
 from datetime import datetime, timezone, timedelta
 
 from celery import Celery
-from PIL import Image, ImageDraw, ImageFont
+from celery.signals import worker_process_init
 from celery.utils.log import get_task_logger
-
-from src.tasks.schema import CertificatePayload
+from celery.exceptions import Retry
+from decouple import config
+
+from src.jobs import job_tracker
+from src.tasks.errors import (
+    FontLoadError,
+    MissingFieldError,
+    StorageUnavailableError,
+    TemplateNotFoundError,
+)
+from src.tasks.memory import (
+    CanvasPool,
+    MemoryBudget,
+    estimate_render_bytes,
+    track_render_memory,
+)
+from src.tasks.resilience import retry_policy, storage_breaker
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 logger = get_task_logger(__name__)
 
+FONT_PATH = BASE_DIR / Path("assets/fonts/Dynalight-Regular.ttf")
+TEMPLATE_PATH = BASE_DIR / Path("assets/media/new_certificate_template.jpg")
+NAME_FONT_SIZES = (80, 70, 60, 50)
+SMALL_FONT_SIZE = 22
+
+_assets: dict[str, Any] = {}
+
+# Memory held by in-flight renders across all of a worker's children, in MiB
+RENDER_MEMORY_BUDGET_MB: int = config("RENDER_MEMORY_BUDGET_MB", default=512, cast=int)
+# Seconds a render waits for memory before it is admitted regardless
+RENDER_ADMISSION_TIMEOUT: float = config(
+    "RENDER_ADMISSION_TIMEOUT", default=120.0, cast=float
+)
+
+# Created at import, i.e. in the worker parent before the pool forks, so the
+# prefork children share one budget
+render_budget = MemoryBudget(
+    RENDER_MEMORY_BUDGET_MB * 1024 * 1024, timeout=RENDER_ADMISSION_TIMEOUT
+)
+canvas_pool = CanvasPool()
+
+
+def load_assets() -> dict[str, Any]:
+    """
+    Loads the certificate template and fonts once per process.
+
+    PIL is imported here instead of at module level so that beat and any
+    other process that only imports the task definitions never pays for it.
+    A missing template is not cached: it is looked for again on the next
+    call, as it was on every render before assets were preloaded.
+
+    Returns:
+        dict: "template" (RGB image or None if missing), "fonts" keyed by
+              name font size, and "small_font"
+    """
+    from PIL import Image, ImageFont
+
+    if "fonts" not in _assets:
+        fonts: dict[int, ImageFont.FreeTypeFont | ImageFont.ImageFont] = {}
+        using_default = False
+        for size in NAME_FONT_SIZES:
+            try:
+                fonts[size] = ImageFont.truetype(FONT_PATH, size)
+            except OSError:
+                try:
+                    fonts[size] = ImageFont.load_default(size)
+                except OSError as exc:
+                    raise FontLoadError(f"Could not load any font: {exc}") from exc
+                using_default = True
+        if using_default:
+            logger.warning(f"Font not found: {FONT_PATH}, using default font.")
+        _assets.update(fonts=fonts, small_font=ImageFont.load_default(SMALL_FONT_SIZE))
+
+    if _assets.get("template") is None:
+        _assets["template"] = None
+        if TEMPLATE_PATH.exists():
+            with Image.open(TEMPLATE_PATH) as img:
+                _assets["template"] = img.convert("RGB")
+
+    return _assets
+
+
+@worker_process_init.connect
+def preload_assets(**kwargs) -> None:
+    try:
+        load_assets()
+    except FontLoadError:
+        # Don't take the child down; each render will fail permanently instead
+        logger.error("Could not preload certificate assets", exc_info=True)
+
 
 def generate_certificate_2025(data: dict[str, Any]) -> str:
     """
@@ -30,6 +115,7 @@ def generate_certificate_2025(data: dict[str, Any]) -> str:
     Returns:
         str: Path to the generated certificate file
     """
+    from PIL import Image, ImageDraw, ImageFont
 
     def add_custom(
         img: Image.Image,  # Add this parameter
@@ -42,22 +128,20 @@ def generate_certificate_2025(data: dict[str, Any]) -> str:
         if rotated:
             bbox = font.getbbox(text)
             text_width, text_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
-            text_image = Image.new(
-                "RGBA", (text_width + 300, text_height + 30), (0, 0, 0, 0)
-            )
-            draw_text = ImageDraw.Draw(text_image)
-            draw_text.text(
-                (0, 0), text=text, font=font, fill="black"
-            )  # Also fixed this line
-            rotated_text = text_image.rotate(90.0, expand=True)
-            img.paste(rotated_text, position, rotated_text)  # Complete line 48
+            # Single-band coverage mask instead of an RGBA image: a quarter
+            # of the memory, and pasting black through it gives the same result.
+            text_mask = Image.new("L", (text_width + 300, text_height + 30), 0)
+            draw_text = ImageDraw.Draw(text_mask)
+            draw_text.text((0, 0), text=text, font=font, fill=255)
+            rotated_mask = text_mask.transpose(Image.Transpose.ROTATE_90)
+            img.paste("black", position, rotated_mask)
             return
         draw.text(position, text, "black", font, spacing=2)
 
     person_name = data.get("name")
 
     if not person_name:
-        raise ValueError("Missing required field: 'name'")
+        raise MissingFieldError("Missing required field: 'name'")
 
     name_length = len(person_name)
     if name_length <= 30:
@@ -69,25 +153,22 @@ def generate_certificate_2025(data: dict[str, Any]) -> str:
     else:
         font_size = 50
 
-    try:
-        font = ImageFont.truetype(
-            BASE_DIR / Path("assets/fonts/Dynalight-Regular.ttf"), font_size
-        )
-    except OSError:
-
-        font = ImageFont.load_default(font_size)
-        print("Warning: arial.ttf not found, using default font.")
+    assets = load_assets()
+    font = assets["fonts"][font_size]
 
     text_position = (130, 490)
-    template_path = BASE_DIR / Path("assets/media/new_certificate_template.jpg")
-    if not template_path.exists():
-        raise FileNotFoundError(
+    if assets["template"] is None:
+        raise TemplateNotFoundError(
             "Certificate template not found: certificate_template.png",
-            f"{template_path}",
+            f"{TEMPLATE_PATH}",
         )
 
-    with Image.open(template_path) as img:
-        img = img.convert("RGB")
+    template = assets["template"]
+    with (
+        render_budget.reserve(estimate_render_bytes(template.size)),
+        track_render_memory(person_name),
+        canvas_pool.canvas(template) as img,
+    ):
         draw = ImageDraw.Draw(img)
         stroke_width = 1
         stroke_fill = "#1A693D"
@@ -102,8 +183,7 @@ def generate_certificate_2025(data: dict[str, Any]) -> str:
             # anchor="mm",
         )
 
-        small_font_size = 22
-        small_font = ImageFont.load_default(small_font_size)
+        small_font = assets["small_font"]
 
         current_date = datetime.now(timezone.utc).strftime("%d/%m/%Y")
         expiry_date = datetime.now(timezone.utc) + timedelta(days=730)
@@ -133,18 +213,20 @@ def generate_certificate_2025(data: dict[str, Any]) -> str:
         output_path = Path(
             f"certificates/{person_name.replace(' ', '_')}_certificate.png"
         )
-        img.save(output_path, "PNG")
-
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-
         output_path_pdf = Path(f"pdf_upload/certificate_2025-{certificate_id}.pdf")
 
-        output_path_pdf.parent.mkdir(parents=True, exist_ok=True)
+        # Writing the certificates is this worker's storage I/O: failures
+        # there are retried and count against the storage breaker
+        with storage_breaker.guard((OSError,), StorageUnavailableError):
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            img.save(output_path, "PNG")
+
+            if img.mode in ("RGBA", "P"):
+                img = img.convert("RGB")
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path_pdf.parent.mkdir(parents=True, exist_ok=True)
 
-        img.save(output_path_pdf, "PDF", resolution=100.0)
+            img.save(output_path_pdf, "PDF", resolution=100.0)
 
     upload_certificate_to_folder(output_path)
 
@@ -162,29 +244,35 @@ def upload_certificate_to_folder(certificate_path: str | Path):
     if not certificate_path.exists():
         raise FileNotFoundError(f"Certificate file not found: {certificate_path}")
 
+    # The remote upload belongs inside storage_breaker.guard() once it exists
     print(f"Uploaded certificate: {certificate_path}")
 
 
-def create_membership_certificate(app: Celery):
+def create_membership_certificate(app: Celery, queue: str = "2025_certification"):
     logger = get_task_logger(__name__)
     logger.info("Task created")
 
     @app.task(
         bind=True,
         name="certification.first_tasks",
-        autoretry_for=(Exception,),
-        retry_backoff=True,
-        retry_jitter=True,
-        retry_kwargs={"max_retries": 5},
+        max_retries=5,
+        retry_budget=0.1,
     )
     def create_certificates(self, **kwargs):
         logger.info("Performing Task")
         logger.info(f"Processing certificate for: {kwargs.get('name')}")
+        job_id = kwargs.pop("job_id", None)
         try:
-            generate_certificate_2025(kwargs)
+            with retry_policy(self, queue=queue):
+                # Fail fast rather than render a certificate we cannot upload
+                storage_breaker.check()
+                generate_certificate_2025(kwargs)
             logger.info(f"Certificate created successfully for {kwargs.get('name')}")
         except Exception as e:
             logger.error(f"Failed for {kwargs.get('name')}: {e}", exc_info=True)
+            if not isinstance(e, Retry):
+                job_tracker.record(job_id, succeeded=False)
             raise
+        job_tracker.record(job_id, succeeded=True)
 
     return create_certificates
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+
+class CertificationError(Exception):
+    """Base class for failures raised by the certification tasks."""
+
+
+class RetryableError(CertificationError):
+    """A transient failure that may succeed if the task is retried later."""
+
+
+class PermanentError(CertificationError):
+    """A deterministic failure that no amount of retrying will fix."""
+
+
+class MissingFieldError(PermanentError, ValueError):
+    """The payload is missing a field the certificate needs."""
+
+
+class TemplateNotFoundError(PermanentError, FileNotFoundError):
+    """The certificate template is not available on this worker."""
+
+
+class FontLoadError(PermanentError, OSError):
+    """Neither the certificate font nor the fallback font could be loaded."""
+
+
+class StorageUnavailableError(RetryableError):
+    """The certificate storage backend could not be reached."""
+
+
+class DatabaseUnavailableError(RetryableError):
+    """The database could not be reached."""
+
+
+class CircuitOpenError(RetryableError):
+    """A backend's circuit breaker is open; calls are refused until it resets."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+# Anything outside these is treated as permanent: an unexpected exception is
+# far more likely to be a bug or bad payload than a flaky backend.
+RETRYABLE_EXCEPTIONS: tuple[type[BaseException], ...] = (
+    RetryableError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, RETRYABLE_EXCEPTIONS)
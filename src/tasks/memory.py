@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+import os
+import math
+import time
+import resource
+import threading
+import multiprocessing
+from typing import TYPE_CHECKING, Any, Iterator
+from contextlib import contextmanager
+
+from celery.utils.log import get_task_logger
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+logger = get_task_logger(__name__)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_bytes() -> int:
+    """
+    Returns the current resident set size of this process.
+
+    Reads /proc/self/statm on Linux and falls back to the peak RSS reported
+    by getrusage elsewhere.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Returns the peak resident set size of this process (ru_maxrss is KiB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def available_memory_bytes() -> int | None:
+    """Returns MemAvailable from /proc/meminfo, or None where it can't be read."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def estimate_render_bytes(size: tuple[int, int]) -> int:
+    """
+    Estimates the memory one render holds at its peak.
+
+    That is the RGB canvas plus an encode buffer of the same order for the
+    PDF (JPEG) output; the rotated text masks are negligible next to those.
+    """
+    width, height = size
+    return width * height * 3 * 2
+
+
+class MemoryBudget:
+    """
+    Limits in-flight renders across the worker's processes by their
+    estimated memory.
+
+    Acts as a weighted semaphore over MiB units: `reserve` blocks until the
+    requested memory fits under the budget. It is backed by multiprocessing
+    primitives, so a budget created at import time (in the worker parent,
+    before the prefork pool forks) is shared by every child. A single render
+    larger than the whole budget is admitted on its own rather than blocking
+    forever.
+
+    If a reservation can't be made within `timeout` seconds the render is
+    admitted anyway with a warning, so units leaked by a child killed
+    mid-render can't wedge the worker.
+    """
+
+    UNIT = 1024 * 1024
+
+    def __init__(self, budget_bytes: int, timeout: float | None = None):
+        self.budget_bytes = budget_bytes
+        self.units = max(budget_bytes // self.UNIT, 1)
+        self.timeout = timeout
+        self._free = multiprocessing.BoundedSemaphore(self.units)
+        # Serialises acquisition so two renders can't each hold half the
+        # units they need and wait on each other
+        self._admission = multiprocessing.Lock()
+
+    @property
+    def in_use(self) -> int:
+        """Bytes currently reserved, across all processes sharing the budget."""
+        return (self.units - self._free.get_value()) * self.UNIT
+
+    def _acquire(self, units: int) -> int:
+        if not self._admission.acquire(timeout=self.timeout):
+            return 0
+        acquired = 0
+        try:
+            while acquired < units and self._free.acquire(timeout=self.timeout):
+                acquired += 1
+        finally:
+            self._admission.release()
+        return acquired
+
+    @contextmanager
+    def reserve(self, nbytes: int) -> Iterator[None]:
+        units = min(math.ceil(nbytes / self.UNIT), self.units)
+        acquired = self._acquire(units)
+        if acquired < units:
+            logger.warning(
+                f"Render admitted without a full memory reservation "
+                f"({acquired}/{units} MiB) after {self.timeout}s"
+            )
+        try:
+            yield
+        finally:
+            for _ in range(acquired):
+                self._free.release()
+
+
+class CanvasPool:
+    """
+    Reuses full-size canvases between renders instead of allocating a new
+    image per call.
+
+    A canvas is reset by pasting the template over it, which writes into the
+    existing buffer. At most `max_idle` canvases are kept between renders.
+    """
+
+    def __init__(self, max_idle: int = 2):
+        self.max_idle = max_idle
+        self._idle: list["Image.Image"] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def canvas(self, template: "Image.Image") -> Iterator["Image.Image"]:
+        from PIL import Image
+
+        with self._lock:
+            img = None
+            while self._idle and img is None:
+                candidate = self._idle.pop()
+                if candidate.size == template.size and candidate.mode == template.mode:
+                    img = candidate
+        if img is None:
+            img = Image.new(template.mode, template.size)
+        img.paste(template, (0, 0))
+        try:
+            yield img
+        finally:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(img)
+
+
+@contextmanager
+def track_render_memory(label: str, interval: float = 0.01) -> Iterator[dict[str, Any]]:
+    """
+    Samples RSS every `interval` seconds while a render runs.
+
+    ru_maxrss is the process's lifetime high-water mark, so once a child has
+    rendered once it no longer moves; the peak here comes from sampling
+    instead. The yielded dict is filled in on exit with "rss_before",
+    "rss_after", "peak_rss" and "peak_growth" (bytes above "rss_before") and
+    "duration" (seconds).
+    """
+    stats: dict[str, Any] = {}
+    rss_before = rss_bytes()
+    peak = [rss_before]
+    done = threading.Event()
+
+    def sample() -> None:
+        while not done.wait(interval):
+            peak[0] = max(peak[0], rss_bytes())
+
+    sampler = threading.Thread(target=sample, name="render-rss-sampler", daemon=True)
+    start = time.perf_counter()
+    sampler.start()
+    try:
+        yield stats
+    finally:
+        done.set()
+        sampler.join()
+        rss_after = rss_bytes()
+        peak_rss = max(peak[0], rss_after)
+        stats.update(
+            rss_before=rss_before,
+            rss_after=rss_after,
+            peak_rss=peak_rss,
+            peak_growth=peak_rss - rss_before,
+            duration=time.perf_counter() - start,
+        )
+        logger.info(
+            f"Render memory for {label}: "
+            f"rss {stats['rss_before'] // 1024}KiB -> {stats['rss_after'] // 1024}KiB, "
+            f"peak +{stats['peak_growth'] // 1024}KiB in {stats['duration']:.2f}s"
+        )
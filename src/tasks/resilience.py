@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from celery import Task
+from celery.exceptions import Ignore, Reject, Retry
+from celery.signals import worker_init, worker_ready
+from celery.utils.log import get_task_logger
+from celery.utils.time import get_exponential_backoff_interval
+from celery.worker.control import control_command
+from decouple import config
+from kombu import Exchange, Queue
+
+from src.tasks.errors import CircuitOpenError, is_retryable
+
+
+logger = get_task_logger(__name__)
+
+DLX_EXCHANGE = "dlx"
+DLX_ROUTING_KEY = "dead"
+DLX_QUEUE = Queue(
+    "dlx",
+    exchange=Exchange(DLX_EXCHANGE, type="direct"),
+    routing_key=DLX_ROUTING_KEY,
+)
+
+DEFAULT_RETRY_BUDGET: float = config("RETRY_BUDGET", default=0.2, cast=float)
+# Retries always allowed per window; kept small so that at a prefork child's
+# few dozen renders a minute the ratio, not this floor, is the limit
+RETRY_BUDGET_MINIMUM: int = config("RETRY_BUDGET_MINIMUM", default=2, cast=int)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a backend after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and every
+    call raises CircuitOpenError for `reset_timeout` seconds. The first call
+    after that is let through as a probe: success closes the circuit, failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.remaining() > 0:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def remaining(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        if self.opened_at is None:
+            return 0.0
+        return max(self.opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def check(self) -> None:
+        if self.state == self.OPEN:
+            raise CircuitOpenError(self.name, self.remaining())
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit '{self.name}' closed")
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                logger.warning(
+                    f"Circuit '{self.name}' opened after {self.failures} failures"
+                )
+
+    @contextmanager
+    def guard(
+        self,
+        failures: tuple[type[BaseException], ...],
+        error: type[Exception],
+    ) -> Iterator[None]:
+        """
+        Runs the block through the breaker.
+
+        Exceptions in `failures` count against the backend and are re-raised
+        as `error`; anything else passes through without touching the circuit.
+        """
+        self.check()
+        try:
+            yield
+        except failures as exc:
+            self.record_failure()
+            raise error(f"{self.name}: {exc}") from exc
+        self.record_success()
+
+
+storage_breaker = CircuitBreaker(
+    "storage",
+    failure_threshold=config("STORAGE_BREAKER_THRESHOLD", default=5, cast=int),
+    reset_timeout=config("STORAGE_BREAKER_RESET", default=30.0, cast=float),
+)
+db_breaker = CircuitBreaker(
+    "db",
+    failure_threshold=config("DB_BREAKER_THRESHOLD", default=5, cast=int),
+    reset_timeout=config("DB_BREAKER_RESET", default=30.0, cast=float),
+)
+breakers = (storage_breaker, db_breaker)
+
+
+class RetryBudget:
+    """
+    Caps retries of one task type to a fraction of its recent first attempts.
+
+    Within a sliding `window` (seconds), retries are allowed while they stay
+    under `ratio` of first attempts, with `minimum` retries always allowed so
+    a quiet worker can still ride out a blip. Counters are per process.
+    """
+
+    def __init__(
+        self, ratio: float, minimum: int = RETRY_BUDGET_MINIMUM, window: float = 60.0
+    ):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window = window
+        self._attempts: deque[float] = deque()
+        self._retries: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        for events in (self._attempts, self._retries):
+            while events and events[0] <= now - self.window:
+                events.popleft()
+
+    def record_attempt(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._attempts.append(now)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            allowed = max(self.minimum, self.ratio * len(self._attempts))
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+_retry_budgets: dict[str, RetryBudget] = {}
+
+
+def get_retry_budget(task: Task) -> RetryBudget:
+    """Returns the per-process budget for `task`'s type, sized by its `retry_budget` option."""
+    budget = _retry_budgets.get(task.name)
+    if budget is None:
+        ratio = getattr(task, "retry_budget", DEFAULT_RETRY_BUDGET)
+        budget = _retry_budgets.setdefault(task.name, RetryBudget(ratio))
+    return budget
+
+
+def dead_letter(task: Task, exc: BaseException, reason: str) -> None:
+    """
+    Publishes the failed request to the DLX with the failure reason attached.
+
+    The message carries no Celery task headers, so nothing consuming the
+    dead-letter queue will execute it again.
+    """
+    request = task.request
+    headers = {
+        "x-failure-reason": reason,
+        "x-exception": f"{type(exc).__name__}: {exc}",
+        "x-task-name": task.name,
+        "x-task-id": request.id,
+        "x-retries": request.retries,
+    }
+    body = {"args": list(request.args or ()), "kwargs": request.kwargs or {}}
+    try:
+        with task.app.producer_or_acquire() as producer:
+            producer.publish(
+                body,
+                exchange=DLX_EXCHANGE,
+                routing_key=DLX_ROUTING_KEY,
+                serializer="json",
+                headers=headers,
+                delivery_mode=2,
+                retry=True,
+                declare=[DLX_QUEUE],
+            )
+    except Exception:
+        logger.error(f"Could not dead-letter task {request.id}", exc_info=True)
+        return
+    logger.warning(f"Dead-lettered task {request.id} ({task.name}): {reason}")
+
+
+@worker_ready.connect
+def declare_dead_letter_queue(sender=None, **kwargs) -> None:
+    """Declares the DLX queue so messages expiring from the task queues land in it."""
+    with sender.app.connection_for_write() as conn:
+        DLX_QUEUE(conn.default_channel).declare()
+
+
+# Worker side: queues this worker has stopped consuming from, and until when
+_paused_queues: dict[str, float] = {}
+# Task side: pauses this process has already asked for, so each is sent once
+_pause_requests: dict[str, float] = {}
+# Node name of the worker this process belongs to; set before the pool forks
+_worker_nodename: str | None = None
+
+
+@worker_init.connect
+def remember_worker_nodename(sender=None, **kwargs) -> None:
+    global _worker_nodename
+    _worker_nodename = sender.hostname
+
+
+@control_command(
+    args=[("queue", str), ("seconds", float)],
+    signature="<queue> <seconds>",
+)
+def pause_queue(state, queue: str, seconds: float) -> dict[str, Any]:
+    """Stops consuming from `queue` on this worker for `seconds`."""
+    consumer = state.consumer
+    now = time.monotonic()
+    if _paused_queues.get(queue, 0.0) > now:
+        return {"ok": f"already paused {queue}"}
+    if not consumer.task_consumer.consuming_from(queue):
+        return {"ok": f"not consuming from {queue}"}
+
+    declared = consumer.app.amqp.queues[queue]
+    consumer.cancel_task_queue(queue)
+    _paused_queues[queue] = now + seconds
+
+    def resume() -> None:
+        _paused_queues.pop(queue, None)
+        consumer.app.amqp.queues.select_add(declared)
+        consumer.add_task_queue(queue)
+
+    consumer.timer.call_after(seconds, resume)
+    logger.warning(f"Paused consuming from {queue} for {seconds:.0f}s")
+    return {"ok": f"paused {queue} for {seconds:.0f}s"}
+
+
+def request_pause(task: Task, queue: str, seconds: float) -> None:
+    """Asks the worker running `task` to stop consuming from `queue` for `seconds`."""
+    if _pause_requests.get(queue, 0.0) > time.monotonic():
+        return
+    _pause_requests[queue] = time.monotonic() + seconds
+    try:
+        # Own connection: the app pool (broker_pool_limit=1) may be held by
+        # the worker, and waiting on it here would block the task forever
+        with task.app.connection_for_write() as conn:
+            task.app.control.broadcast(
+                "pause_queue",
+                arguments={"queue": queue, "seconds": seconds},
+                # request.hostname is only the node name under prefork;
+                # the solo and threads pools set the bare host name
+                destination=[_worker_nodename or task.request.hostname],
+                connection=conn,
+            )
+    except Exception:
+        logger.error(f"Could not pause consuming from {queue}", exc_info=True)
+
+
+def defer(task: Task, exc: BaseException, countdown: float) -> Retry:
+    """
+    Re-sends the request after `countdown` without counting it as a retry.
+
+    For calls an open breaker refused: the backend was never tried, so the
+    attempt spends neither `max_retries` nor the retry budget, however long
+    the outage lasts.
+    """
+    request = task.request
+    signature = task.signature_from_request(
+        request, countdown=countdown, retries=request.retries
+    )
+    try:
+        signature.apply_async()
+    except Exception as send_error:
+        raise Reject(send_error, requeue=False)
+    return Retry(exc=exc, when=countdown, sig=signature)
+
+
+@contextmanager
+def retry_policy(
+    task: Task,
+    queue: str | None = None,
+    countdown: Callable[[int], float] | None = None,
+) -> Iterator[None]:
+    """
+    Applies the retry policy to a task body.
+
+    Permanent failures are dead-lettered at once. Retryable failures are
+    retried with exponential backoff (or `countdown(retries)`) until the
+    task's `max_retries` or its type's retry budget runs out, after which
+    they are dead-lettered too. While a backend's circuit is open the worker
+    stops consuming from `queue` instead of cycling messages through retries,
+    and calls the breaker refused are deferred without counting as retries.
+    """
+    budget = get_retry_budget(task)
+    if not task.request.retries:
+        budget.record_attempt()
+    try:
+        yield
+    except (Retry, Ignore):
+        raise
+    except CircuitOpenError as exc:
+        if queue:
+            request_pause(task, queue, exc.retry_after)
+        raise defer(task, exc, exc.retry_after)
+    except Exception as exc:
+        if not is_retryable(exc):
+            dead_letter(task, exc, "permanent failure")
+            raise
+        if task.max_retries is not None and task.request.retries >= task.max_retries:
+            dead_letter(task, exc, "max retries exceeded")
+            raise
+        if not budget.try_spend():
+            dead_letter(task, exc, "retry budget exhausted")
+            raise
+
+        open_breakers = [b for b in breakers if b.state == CircuitBreaker.OPEN]
+        if open_breakers:
+            delay = max(b.remaining() for b in open_breakers)
+            if queue:
+                request_pause(task, queue, delay)
+        elif countdown is not None:
+            delay = countdown(task.request.retries)
+        else:
+            delay = get_exponential_backoff_interval(
+                factor=1,
+                retries=task.request.retries,
+                maximum=getattr(task, "retry_backoff_max", 600),
+                full_jitter=True,
+            )
+        raise task.retry(exc=exc, countdown=delay)
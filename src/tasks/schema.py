@@ -6,3 +6,5 @@ from pydantic import BaseModel
 class CertificatePayload(BaseModel):
     name: str
     certificate_name: str
+    # Bulk run this certificate belongs to; see src/jobs
+    job_id: str | None = None
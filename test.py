@@ -7,6 +7,25 @@ from tests.unit_tests.test_certificate_generation import (
     TestCertificatePayload,
     TestCertificatePublisherUnit,
 )
+from tests.unit_tests.test_autoscale import (
+    TestCertificationAutoscaler,
+    TestScalingPolicy,
+)
+from tests.unit_tests.test_certificate_assets import TestCertificateAssets
+from tests.unit_tests.test_import_time import TestImportTime
+from tests.unit_tests.test_jobs import TestJobStore, TestJobTracker
+from tests.unit_tests.test_load_harness import TestLoadHarness, TestLoadHarnessSmoke
+from tests.unit_tests.test_render_memory import (
+    TestCanvasPool,
+    TestMemoryBudget,
+    TestTrackRenderMemory,
+)
+from tests.unit_tests.test_resilience import (
+    TestCircuitBreaker,
+    TestErrorTaxonomy,
+    TestRetryBudget,
+)
+from tests.unit_tests.test_task_retries import TestTaskRetries
 
 
 if __name__ == "__main__":
@@ -18,6 +37,25 @@ if __name__ == "__main__":
     unit_suite.addTests(
         unittest.TestLoader().loadTestsFromTestCase(TestCertificatePublisherUnit)
     )
+    unit_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestImportTime))
+    unit_suite.addTests(
+        unittest.TestLoader().loadTestsFromTestCase(TestCertificateAssets)
+    )
+    for case in (TestMemoryBudget, TestCanvasPool, TestTrackRenderMemory):
+        unit_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(case))
+    for case in (
+        TestErrorTaxonomy,
+        TestCircuitBreaker,
+        TestRetryBudget,
+        TestTaskRetries,
+        TestLoadHarness,
+        TestLoadHarnessSmoke,
+        TestScalingPolicy,
+        TestCertificationAutoscaler,
+        TestJobStore,
+        TestJobTracker,
+    ):
+        unit_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(case))
     unittest.TextTestRunner(verbosity=2).run(unit_suite)
 
     # Run integration tests
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput harness for `certification.first_tasks`.
+
+Runs the real Celery app from main.py against kombu's in-memory transport
+with an in-process worker, drives Poisson arrivals of a payload mix through
+the task and reports enqueue-to-completion latency percentiles, throughput
+and error rate for each (concurrency, arrival rate) pair.
+
+Usage:
+    python -m tests.load_tests.harness --concurrency 1,4,8 --rate 10,50 \\
+        --duration 30 --mix short=80,long=15,invalid=5
+
+Renders need the certificate assets. Without them every task fails with a
+missing template; pass --render-stub SECONDS to replace the render with a
+fixed-cost sleep and measure the queueing path on its own.
+
+The figures are for the threads pool, not production's prefork workers.
+"Concurrency" is the number of worker threads in this one process: renders
+share its GIL, so CPU-bound renders scale far worse than with the same
+number of prefork processes, while the sleep stub scales as if they were
+free. On memory:// the worker also prefetches without limit (see
+`use_broker`) where production prefetches one task per process. Use the
+results to compare changes to the task path against each other, not to
+size production worker pools.
+"""
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+import threading
+from typing import Any, Callable
+from pathlib import Path
+from contextlib import chdir, nullcontext
+from unittest.mock import patch
+
+from pydantic import BaseModel
+
+
+TASK_NAME = "certification.first_tasks"
+# Seconds between polls of the in-memory transport (kombu's default is 1s)
+MEMORY_POLLING_INTERVAL = 0.005
+
+PAYLOAD_KINDS = ("short", "medium", "long", "invalid")
+DEFAULT_MIX = {"short": 80, "medium": 10, "long": 5, "invalid": 5}
+
+
+class ScenarioResult(BaseModel):
+    concurrency: int
+    rate: float
+    sent: int
+    succeeded: int
+    failed: int
+    unfinished: int
+    error_rate: float
+    throughput: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `values`; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    """Parses `short=80,long=20` into payload kind weights."""
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in PAYLOAD_KINDS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown payload kind {kind!r}, expected one of {PAYLOAD_KINDS}"
+            )
+        mix[kind] = int(weight)
+    return mix
+
+
+def make_payload(kind: str, seq: int) -> dict[str, Any]:
+    """Builds a payload whose name length exercises a given font size."""
+    payload = {
+        "certificate_name": "Membership",
+        "membership_id": str(100_000 + seq),
+        "certificate_id": str(seq),
+    }
+    if kind == "short":
+        payload["name"] = f"Load Test {seq}"
+    elif kind == "medium":
+        payload["name"] = f"Load Test Member Number {seq:0>10}"
+    elif kind == "long":
+        payload["name"] = f"Load Test Member With A Very Long Full Name {seq:0>10}"
+    return payload
+
+
+def make_render_stub(seconds: float) -> Callable[[dict[str, Any]], str]:
+    """Builds a render replacement that sleeps `seconds` and validates like the real one."""
+
+    def stub_render(data: dict[str, Any]) -> str:
+        from src.tasks.errors import MissingFieldError
+
+        if not data.get("name"):
+            raise MissingFieldError("Missing required field: 'name'")
+        time.sleep(seconds)
+        return ""
+
+    return stub_render
+
+
+def use_broker(app, url: str) -> None:
+    """
+    Points the app at `url`.
+
+    The in-memory transport has no event loop support, so the worker falls
+    back to a blocking loop that only applies acks between 2 second waits
+    for new messages. At the app's prefetch of 1 every message would wait
+    out that timeout, so in-memory runs prefetch without limit instead: the
+    backlog queues inside the worker rather than in the broker, which
+    leaves enqueue-to-completion latency unchanged.
+    """
+    app.conf.broker_url = url
+    if url.startswith("memory://"):
+        app.conf.worker_prefetch_multiplier = 0
+        app.conf.broker_transport_options = {
+            **app.conf.broker_transport_options,
+            "polling_interval": MEMORY_POLLING_INTERVAL,
+        }
+
+
+class LatencyRecorder:
+    """Collects enqueue and completion times keyed by task id."""
+
+    def __init__(self):
+        self.sent: dict[str, float] = {}
+        self.done: dict[str, float] = {}
+        self.failed: set[str] = set()
+        self._lock = threading.Lock()
+        self._all_done = threading.Event()
+        self._closed = False
+
+    def on_sent(self, task_id: str, at: float) -> None:
+        with self._lock:
+            self.sent[task_id] = at
+
+    def close(self) -> None:
+        """Marks the end of enqueueing so `wait` can return once all are done."""
+        with self._lock:
+            self._closed = True
+            self._check_done()
+
+    def _check_done(self) -> None:
+        if self._closed and len(self.done) >= len(self.sent):
+            self._all_done.set()
+
+    def on_success(self, sender=None, **kwargs) -> None:
+        self._complete(sender.request.id)
+
+    def on_failure(self, sender=None, task_id=None, **kwargs) -> None:
+        self._complete(task_id, failed=True)
+
+    def _complete(self, task_id: str, failed: bool = False) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self.done[task_id] = now
+            if failed:
+                self.failed.add(task_id)
+            self._check_done()
+
+    def wait(self, timeout: float) -> bool:
+        return self._all_done.wait(timeout)
+
+    def result(self, concurrency: int, rate: float) -> ScenarioResult:
+        with self._lock:
+            latencies = [
+                self.done[task_id] - sent_at
+                for task_id, sent_at in self.sent.items()
+                if task_id in self.done
+            ]
+            completed = len(latencies)
+            failed = len(self.failed)
+            elapsed = (
+                max(self.done.values()) - min(self.sent.values())
+                if self.done
+                else 0.0
+            )
+            return ScenarioResult(
+                concurrency=concurrency,
+                rate=rate,
+                sent=len(self.sent),
+                succeeded=completed - failed,
+                failed=failed,
+                unfinished=len(self.sent) - completed,
+                error_rate=failed / completed if completed else 0.0,
+                throughput=completed / elapsed if elapsed else 0.0,
+                p50=percentile(latencies, 50),
+                p90=percentile(latencies, 90),
+                p99=percentile(latencies, 99),
+                max=max(latencies, default=0.0),
+            )
+
+
+def run_scenario(
+    app,
+    concurrency: int,
+    rate: float,
+    duration: float,
+    mix: dict[str, int],
+    drain_timeout: float,
+    seed: int | None = None,
+) -> ScenarioResult:
+    """Runs one open-loop load scenario against a fresh in-process worker."""
+    from celery.contrib.testing.worker import start_worker
+    from celery.signals import task_failure, task_success
+
+    task = app.tasks[TASK_NAME]
+    recorder = LatencyRecorder()
+    task_success.connect(recorder.on_success, sender=task, weak=False)
+    task_failure.connect(recorder.on_failure, sender=task, weak=False)
+
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    try:
+        with start_worker(
+            app,
+            pool="threads",
+            concurrency=concurrency,
+            perform_ping_check=False,
+            loglevel="WARNING",
+        ):
+            seq = 0
+            deadline = time.perf_counter() + duration
+            next_at = time.perf_counter()
+            while next_at < deadline:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                payload = make_payload(rng.choices(kinds, weights)[0], seq)
+                sent_at = time.perf_counter()
+                recorder.on_sent(task.apply_async(kwargs=payload).id, sent_at)
+                seq += 1
+                next_at += rng.expovariate(rate)
+            recorder.close()
+            recorder.wait(drain_timeout)
+    finally:
+        task_success.disconnect(recorder.on_success, sender=task)
+        task_failure.disconnect(recorder.on_failure, sender=task)
+    return recorder.result(concurrency, rate)
+
+
+def format_table(results: list[ScenarioResult]) -> str:
+    caption = "threads pool, single process; not comparable to prefork processes"
+    header = (
+        f"{'thr':>5} {'rate/s':>7} {'sent':>6} {'ok':>6} {'fail':>5} {'left':>5} "
+        f"{'err%':>6} {'tput/s':>8} {'p50 s':>7} {'p90 s':>7} {'p99 s':>7} {'max s':>7}"
+    )
+    rows = [caption, header, "-" * len(header)]
+    for r in results:
+        rows.append(
+            f"{r.concurrency:>5} {r.rate:>7.1f} {r.sent:>6} {r.succeeded:>6} "
+            f"{r.failed:>5} {r.unfinished:>5} {r.error_rate * 100:>6.1f} "
+            f"{r.throughput:>8.2f} {r.p50:>7.3f} {r.p90:>7.3f} {r.p99:>7.3f} {r.max:>7.3f}"
+        )
+    return "\n".join(rows)
+
+
+def main(argv: list[str] | None = None) -> list[ScenarioResult]:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--concurrency",
+        type=lambda s: [int(c) for c in s.split(",")],
+        default=[1, 4],
+        help="Comma-separated worker thread counts (default: 1,4)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=lambda s: [float(r) for r in s.split(",")],
+        default=[5.0],
+        help="Comma-separated mean arrival rates in tasks/s (default: 5)",
+    )
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of arrivals per scenario")
+    parser.add_argument("--drain-timeout", type=float, default=120.0, help="Seconds to wait for the backlog to finish")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="Payload mix, e.g. short=80,long=15,invalid=5")
+    parser.add_argument("--render-stub", type=float, default=None, metavar="SECONDS", help="Replace the render with a sleep of this length")
+    parser.add_argument("--broker", default="memory://", help="Broker URL (default: in-memory)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", type=Path, default=None, help="Also write results to this file")
+    args = parser.parse_args(argv)
+
+    from main import app
+
+    use_broker(app, args.broker)
+    app.conf.beat_schedule = {}
+
+    render = (
+        patch(
+            "src.tasks.certification.generate_certificate_2025",
+            make_render_stub(args.render_stub),
+        )
+        if args.render_stub is not None
+        else nullcontext()
+    )
+    results = []
+    # Certificates are written relative to the working directory
+    with tempfile.TemporaryDirectory() as workdir, chdir(workdir), render:
+        for concurrency in args.concurrency:
+            for rate in args.rate:
+                results.append(
+                    run_scenario(
+                        app,
+                        concurrency,
+                        rate,
+                        args.duration,
+                        args.mix,
+                        args.drain_timeout,
+                        args.seed,
+                    )
+                )
+
+    print(format_table(results))
+    if args.json:
+        args.json.write_text(json.dumps([r.model_dump() for r in results], indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ class CertificatePayload(BaseModel):
     name: str
     certificate_name: str
     clean: str
+    job_id: str | None = None
 
 
 class CertificatePublisher:
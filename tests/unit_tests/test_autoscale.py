@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.autoscale import CertificationAutoscaler, Sample, ScalingPolicy
+
+GiB = 1024 ** 3
+
+
+def sample(processes=2, busy=2, queue_depth=0, throughput=1.0,
+           cpu_headroom=0.5, memory_available=8 * GiB):
+    return Sample(processes, busy, queue_depth, throughput, cpu_headroom, memory_available)
+
+
+class TestScalingPolicy(unittest.TestCase):
+    """Unit tests for the certification autoscaling policy"""
+
+    def setUp(self):
+        self.policy = ScalingPolicy(
+            min_procs=1,
+            max_procs=16,
+            target_latency=100,
+            up_step=4,
+            down_step=1,
+            down_ticks=3,
+            min_cpu_headroom=0.1,
+            memory_per_process=GiB,
+        )
+
+    def test_scales_up_for_backlog(self):
+        """Test that a backlog beyond the target latency grows the pool by one step"""
+        # 2 procs at 1 task/s total need 10 procs to drain 500 messages in 100s
+        decision = self.policy.decide(sample(queue_depth=500, throughput=1.0))
+        self.assertEqual(decision.target, 6)
+
+    def test_scale_up_capped_at_max(self):
+        """Test that the configured maximum is respected"""
+        decision = self.policy.decide(sample(processes=15, queue_depth=10_000))
+        self.assertEqual(decision.target, 16)
+
+    def test_cpu_headroom_holds_pool(self):
+        """Test that a saturated host does not grow the pool"""
+        decision = self.policy.decide(sample(queue_depth=500, cpu_headroom=0.05))
+        self.assertEqual(decision.target, 2)
+
+    def test_memory_caps_growth(self):
+        """Test that growth is limited to processes that fit in free memory"""
+        decision = self.policy.decide(
+            sample(queue_depth=500, memory_available=1 * GiB)
+        )
+        self.assertEqual(decision.target, 3)
+
+    def test_scale_down_hysteresis(self):
+        """Test that the pool only shrinks after consecutive idle decisions"""
+        idle = sample(processes=4, busy=0, queue_depth=0)
+        self.assertEqual(self.policy.decide(idle).target, 4)
+        self.assertEqual(self.policy.decide(idle).target, 4)
+        self.assertEqual(self.policy.decide(idle).target, 3)
+
+    def test_load_resets_hysteresis(self):
+        """Test that a busy decision resets the scale-down countdown"""
+        idle = sample(processes=4, busy=0, queue_depth=0)
+        self.policy.decide(idle)
+        self.policy.decide(idle)
+        self.policy.decide(sample(processes=4, busy=4, queue_depth=0))
+        self.assertEqual(self.policy.decide(idle).target, 4)
+
+    def test_recent_scale_up_holds_without_counting(self):
+        """Test that a held shrink does not count towards the hysteresis"""
+        idle = sample(processes=4, busy=0, queue_depth=0)
+        for _ in range(5):
+            self.assertEqual(self.policy.decide(idle, can_shrink=False).target, 4)
+        self.assertEqual(self.policy.decide(idle).target, 4)
+
+    def test_unknown_depth_sizes_to_busy(self):
+        """Test the fallback when the broker can't be queried"""
+        decision = self.policy.decide(sample(processes=4, busy=4, queue_depth=None))
+        self.assertEqual(decision.target, 4)
+
+
+class FakePool:
+    def __init__(self, processes, busy=False):
+        self.num_processes = processes
+        self.busy = busy
+
+    def grow(self, n):
+        self.num_processes += n
+
+    def shrink(self, n):
+        if self.busy:
+            raise ValueError("Can't shrink pool. All processes busy!")
+        self.num_processes -= n
+
+    def maintain_pool(self):
+        pass
+
+
+class FakeBroker:
+    """Stands in for the app: its config and broker connections, counting connections and the threads that read"""
+
+    def __init__(self, max_memory_per_child=None):
+        self.conf = SimpleNamespace(worker_max_memory_per_child=max_memory_per_child)
+        self.depth = 0
+        self.connections = 0
+        self.threads = set()
+        channel = SimpleNamespace(queue_declare=self.queue_declare)
+        self.connection = SimpleNamespace(default_channel=channel, close=lambda: None)
+
+    def connection_for_read(self):
+        self.connections += 1
+        return self.connection
+
+    def queue_declare(self, queue, passive):
+        self.threads.add(threading.get_ident())
+        return SimpleNamespace(message_count=self.depth)
+
+
+class TestCertificationAutoscaler(unittest.TestCase):
+    """Unit tests for the autoscaler against a fake pool and broker"""
+
+    def make_scaler(self, processes=2, keepalive=60.0, busy=False):
+        self.broker = FakeBroker()
+        self.pool = FakePool(processes, busy)
+        worker = SimpleNamespace(
+            app=self.broker,
+            consumer=SimpleNamespace(event_dispatcher=None),
+            use_eventloop=False,
+        )
+        scaler = CertificationAutoscaler(
+            self.pool, 8, 1, worker=worker, keepalive=keepalive
+        )
+        scaler.interval = 0.01
+        scaler.queues = ["2025_certification"]
+        scaler.policy = ScalingPolicy(
+            1, 8, target_latency=100, down_ticks=2, memory_per_process=1
+        )
+        self.addCleanup(scaler.stop_sampling)
+        return scaler
+
+    def setUp(self):
+        for name, value in (("cpu_headroom", 1.0), ("available_memory_bytes", GiB)):
+            patcher = patch(f"src.autoscale.{name}", return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def observe(self, scaler, depth):
+        """Sets the queue depth and waits until the sampler has read it"""
+        self.broker.depth = depth
+        scaler.start_sampling()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            observation = scaler.observation
+            if observation is not None and observation.queue_depth == depth:
+                return
+            time.sleep(0.005)
+        self.fail("sampler never observed the queue depth")
+
+    def tick(self, scaler):
+        scaler._last_sample_at -= scaler.interval
+        return scaler._maybe_scale()
+
+    def test_queue_depth_sampled_off_the_caller(self):
+        """Test that scaling reads the sampler's result over one reused connection"""
+        scaler = self.make_scaler()
+        self.observe(scaler, 0)
+        self.observe(scaler, 500)
+        for _ in range(3):
+            self.tick(scaler)
+        self.assertNotIn(threading.get_ident(), self.broker.threads)
+        self.assertEqual(self.broker.connections, 1)
+
+    def test_event_loop_scales_on_interval(self):
+        """Test that the event loop schedules decisions while no messages arrive"""
+        calls = []
+        worker = SimpleNamespace(
+            app=FakeBroker(),
+            consumer=SimpleNamespace(event_dispatcher=None),
+            use_eventloop=True,
+            timer=SimpleNamespace(call_repeatedly=lambda *args: calls.append(args)),
+        )
+        scaler = CertificationAutoscaler(FakePool(2), 8, 1, worker=worker)
+        self.assertEqual(calls, [(scaler.interval, scaler.maybe_scale)])
+
+    def test_memory_per_process_follows_recycle_threshold(self):
+        """Test that growth is sized by worker_max_memory_per_child (KiB)"""
+        worker = SimpleNamespace(app=FakeBroker(max_memory_per_child=400_000))
+        scaler = CertificationAutoscaler(FakePool(2), 8, 1, worker=worker)
+        self.assertEqual(scaler.policy.memory_per_process, 400_000 * 1024)
+
+        worker = SimpleNamespace(app=FakeBroker(max_memory_per_child=None))
+        scaler = CertificationAutoscaler(FakePool(2), 8, 1, worker=worker)
+        self.assertIsNone(scaler.policy.memory_per_process)
+
+    def test_fork_waits_for_sample(self):
+        """Test that a fork waits for an in-progress sample to finish"""
+        scaler = self.make_scaler()
+        sampled = threading.Event()
+
+        def slow_sample():
+            with scaler._sampling:
+                sampled.wait(5)
+                time.sleep(0.1)
+
+        sampler = threading.Thread(target=slow_sample)
+        sampler.start()
+        sampled.set()
+        started = time.monotonic()
+        scaler._before_fork()
+        self.assertGreater(time.monotonic() - started, 0.05)
+        scaler._after_fork_in_parent()
+        sampler.join()
+        self.assertFalse(scaler._sampling.locked())
+
+    def test_child_drops_inherited_connection(self):
+        """Test that a forked child does not keep the parent's broker connection"""
+        scaler = self.make_scaler()
+        self.observe(scaler, 3)
+        self.assertIsNotNone(scaler._connection)
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(write, b"1" if scaler._connection is None else b"0")
+            os._exit(0)
+        os.waitpid(pid, 0)
+        self.assertEqual(os.read(read, 1), b"1")
+        os.close(read)
+        os.close(write)
+        self.assertIsNotNone(scaler._connection)
+
+    def test_rate_limited_to_interval(self):
+        """Test that per-message calls between intervals make no decision"""
+        scaler = self.make_scaler()
+        scaler.interval = 60.0
+        self.observe(scaler, 500)
+        scaler._last_sample_at = time.monotonic()
+        self.assertFalse(scaler._maybe_scale())
+        self.assertEqual(sum(scaler.decisions.values()), 0)
+
+    def test_scales_up_for_backlog(self):
+        """Test that a backlog grows the pool and is recorded as up"""
+        scaler = self.make_scaler()
+        self.observe(scaler, 500)
+        self.assertTrue(self.tick(scaler))
+        self.assertEqual(self.pool.num_processes, 6)
+        self.assertEqual(scaler.decisions["up"], 1)
+
+    def test_keepalive_holds_scale_down(self):
+        """Test that an idle pool that just grew is held and recorded as hold"""
+        scaler = self.make_scaler()
+        self.observe(scaler, 500)
+        self.tick(scaler)
+        self.observe(scaler, 0)
+        for _ in range(4):
+            self.assertFalse(self.tick(scaler))
+        self.assertEqual(self.pool.num_processes, 6)
+        self.assertEqual(scaler.decisions["down"], 0)
+        self.assertEqual(scaler.policy._below, 0)
+
+    def test_scales_down_after_hysteresis(self):
+        """Test that an idle pool shrinks once the keepalive and hysteresis pass"""
+        scaler = self.make_scaler(processes=4, keepalive=0.001)
+        self.observe(scaler, 0)
+        self.assertFalse(self.tick(scaler))
+        self.assertTrue(self.tick(scaler))
+        self.assertEqual(self.pool.num_processes, 3)
+        self.assertEqual(scaler.decisions["down"], 1)
+
+    def test_refused_shrink_recorded_as_hold(self):
+        """Test that a shrink the pool refuses is not counted as down"""
+        scaler = self.make_scaler(processes=4, keepalive=0.001, busy=True)
+        self.observe(scaler, 0)
+        self.tick(scaler)
+        self.assertFalse(self.tick(scaler))
+        self.assertEqual(self.pool.num_processes, 4)
+        self.assertEqual(scaler.decisions["down"], 0)
+        self.assertIn("busy", scaler.last_decision.reason)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from src.tasks import certification
+
+
+class TestCertificateAssets(unittest.TestCase):
+    """Unit tests for per-process asset loading"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template_path = Path(self.tmp.name) / "template.jpg"
+        saved = dict(certification._assets)
+        certification._assets.clear()
+        self.addCleanup(certification._assets.update, saved)
+        self.addCleanup(certification._assets.clear)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_missing_template_is_not_cached(self):
+        """Test that a template added after startup is picked up"""
+        with patch.object(certification, "TEMPLATE_PATH", self.template_path):
+            self.assertIsNone(certification.load_assets()["template"])
+
+            Image.new("RGB", (20, 10), "white").save(self.template_path)
+            template = certification.load_assets()["template"]
+
+        self.assertIsNotNone(template)
+        self.assertEqual(template.size, (20, 10))
+
+    def test_missing_template_fails_render(self):
+        """Test that rendering without a template raises TemplateNotFoundError"""
+        with patch.object(certification, "TEMPLATE_PATH", self.template_path):
+            with self.assertRaises(certification.TemplateNotFoundError):
+                certification.generate_certificate_2025({"name": "Jane Doe"})
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import unittest
+import subprocess
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Modules that must not be imported when a worker or beat loads `main`;
+# they are pulled in lazily by the code paths that actually need them.
+HEAVY_MODULES = ("sqlmodel", "sqlalchemy", "PIL")
+
+# Celery is imported first in the same interpreter, and `main` is timed for
+# what it adds on top as a fraction of Celery's own import time. The ratio
+# holds across machines where a wall-clock figure would not.
+REFERENCE_MODULE = "celery.app"
+# Recorded ratio of `main`'s import time to REFERENCE_MODULE's. Re-record it
+# (and say why in the commit) when an intentional change moves startup.
+IMPORT_TIME_BASELINE_RATIO = float(os.environ.get("IMPORT_TIME_BASELINE_RATIO", 0.16))
+# Fail once startup is more than 30% slower than the baseline
+IMPORT_TIME_BUDGET_RATIO = IMPORT_TIME_BASELINE_RATIO * 1.3
+# Fresh interpreters are noisy; the fastest of a few runs is the stable figure
+IMPORT_TIME_RUNS = 3
+
+
+def measure_import(*modules: str) -> tuple[dict[str, int], set[str]]:
+    """Imports `modules` in order in a fresh interpreter under `-X importtime`.
+
+    Returns the cumulative import time of each of `modules` in microseconds
+    and the set of top-level package names that were imported along the way.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {m}" for m in modules)],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        imported.add(name.split(".")[0])
+        if name in modules:
+            cumulative[name] = int(cumulative_us)
+    return cumulative, imported
+
+
+class TestImportTime(unittest.TestCase):
+    """Import-time budget for the worker and beat entry point (`main`)"""
+
+    @classmethod
+    def setUpClass(cls):
+        runs = [measure_import(REFERENCE_MODULE, "main") for _ in range(IMPORT_TIME_RUNS)]
+        cls.ratio = min(
+            cumulative["main"] / cumulative[REFERENCE_MODULE] for cumulative, _ in runs
+        )
+        cls.imported = set().union(*(imported for _, imported in runs))
+
+    def test_heavy_modules_are_lazy(self):
+        """Test that DB and imaging libraries are not imported eagerly"""
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, self.imported)
+
+    def test_import_time_within_budget(self):
+        """Test that importing main stays within the startup budget"""
+        self.assertLessEqual(
+            self.ratio,
+            IMPORT_TIME_BUDGET_RATIO,
+            f"`import main` took {self.ratio:.2f}x the import time of "
+            f"{REFERENCE_MODULE} (budget {IMPORT_TIME_BUDGET_RATIO:.2f}x)",
+        )
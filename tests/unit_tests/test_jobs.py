@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from sqlalchemy.exc import OperationalError
+
+from src.jobs.store import JobCounts, JobStore
+from src.jobs.tracker import JobTracker
+
+
+class TestJobStore(unittest.TestCase):
+    """Unit tests for JobStore against a temporary SQLite database"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = JobStore(f"sqlite:///{Path(self.tmp.name) / 'jobs.sqlite3'}")
+
+    def tearDown(self):
+        self.store.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_create_and_progress(self):
+        """Test that a registered job reports everything pending"""
+        job_id = self.store.create(total=10)
+        progress = self.store.progress(job_id)
+        self.assertEqual(progress.total, 10)
+        self.assertEqual(progress.pending, 10)
+        self.assertIsNone(progress.eta)
+
+    def test_apply_batches(self):
+        """Test that batches from several workers add up"""
+        job_id = self.store.create(total=10, job_id="season-2025")
+        self.store.apply({job_id: JobCounts(3, 1, 100.0, 102.0)})
+        self.store.apply({job_id: JobCounts(2, 0, 99.0, 104.0)})
+
+        progress = self.store.progress(job_id)
+        self.assertEqual(progress.succeeded, 5)
+        self.assertEqual(progress.failed, 1)
+        self.assertEqual(progress.pending, 4)
+        self.assertAlmostEqual(progress.throughput, 6 / 5)
+        self.assertAlmostEqual(progress.eta, 4 / (6 / 5))
+
+    def test_apply_unregistered_job(self):
+        """Test that workers can report a job the producer never registered"""
+        self.store.apply({"adhoc": JobCounts(1, 0, 1.0, 1.0)})
+        progress = self.store.progress("adhoc")
+        self.assertEqual(progress.succeeded, 1)
+        self.assertIsNone(progress.pending)
+
+    def test_unknown_job(self):
+        """Test that an unknown job has no progress"""
+        self.assertIsNone(self.store.progress("missing"))
+
+
+class TestJobTracker(unittest.TestCase):
+    """Unit tests for JobTracker batching"""
+
+    def setUp(self):
+        self.store = MagicMock()
+        self.tracker = JobTracker(batch_size=3, flush_interval=60, store=self.store)
+
+    def tearDown(self):
+        self.tracker.flush()
+
+    def test_flushes_in_batches(self):
+        """Test that counts are written once per batch"""
+        self.tracker.record("job", succeeded=True)
+        self.tracker.record("job", succeeded=False)
+        self.store.apply.assert_not_called()
+
+        self.tracker.record("job", succeeded=True)
+        self.store.apply.assert_called_once()
+        counts = self.store.apply.call_args[0][0]["job"]
+        self.assertEqual((counts.succeeded, counts.failed), (2, 1))
+
+    def test_untracked_tasks_are_ignored(self):
+        """Test that payloads without a job ID are not counted"""
+        self.tracker.record(None, succeeded=True)
+        self.tracker.flush()
+        self.store.apply.assert_not_called()
+
+    def test_failed_flush_keeps_counts(self):
+        """Test that counts survive a store outage"""
+        self.store.apply.side_effect = OperationalError("UPDATE", {}, Exception("locked"))
+        self.tracker.record("job", succeeded=True)
+        self.tracker.flush()
+
+        self.store.apply.side_effect = None
+        self.tracker.flush()
+        counts = self.store.apply.call_args[0][0]["job"]
+        self.assertEqual(counts.succeeded, 1)
+
+    def test_failed_flush_is_retried(self):
+        """Test that a failed flush re-arms the timer and the retry writes the counts"""
+        tracker = JobTracker(batch_size=100, flush_interval=0.05, store=self.store)
+        self.addCleanup(tracker.flush)
+        self.store.apply.side_effect = [
+            OperationalError("UPDATE", {}, Exception("locked")),
+            None,
+        ]
+        tracker.record("job", succeeded=True)
+
+        deadline = time.monotonic() + 5
+        while self.store.apply.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.store.apply.call_count, 2)
+        counts = self.store.apply.call_args[0][0]["job"]
+        self.assertEqual(counts.succeeded, 1)
+
+    def test_retry_waits_for_breaker(self):
+        """Test that the retry is scheduled when the open breaker lets a probe through"""
+        self.tracker.breaker.failure_threshold = 1
+        self.tracker.breaker.reset_timeout = 120
+        self.store.apply.side_effect = OperationalError("UPDATE", {}, Exception("down"))
+        self.tracker.record("job", succeeded=True)
+        self.tracker.flush()
+
+        self.assertGreater(self.tracker._timer.interval, 60)
+        # Completions past the batch size wait for the retry
+        for _ in range(5):
+            self.tracker.record("job", succeeded=True)
+        self.assertEqual(self.store.apply.call_count, 1)
+
+        self.tracker.breaker.record_success()
+        self.store.apply.side_effect = None
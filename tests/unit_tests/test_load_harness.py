@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import argparse
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from main import app
+from tests.load_tests.harness import (
+    LatencyRecorder,
+    make_payload,
+    make_render_stub,
+    parse_mix,
+    percentile,
+    run_scenario,
+    use_broker,
+)
+
+
+class TestLoadHarness(unittest.TestCase):
+    """Unit tests for the load harness bookkeeping"""
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles"""
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([3.0], 90), 3.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_parse_mix(self):
+        """Test parsing a payload mix"""
+        self.assertEqual(parse_mix("short=80,invalid=20"), {"short": 80, "invalid": 20})
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_mix("huge=1")
+
+    def test_invalid_payload_has_no_name(self):
+        """Test that invalid payloads exercise the permanent-failure path"""
+        self.assertNotIn("name", make_payload("invalid", 1))
+        self.assertGreater(len(make_payload("long", 1)["name"]), 50)
+
+    def test_recorder_result(self):
+        """Test latency, error rate and completion accounting"""
+        recorder = LatencyRecorder()
+        recorder.on_sent("a", 0.0)
+        recorder.on_sent("b", 0.0)
+        recorder.on_sent("c", 0.0)
+        recorder.on_success(sender=SimpleNamespace(request=SimpleNamespace(id="a")))
+        recorder.on_failure(task_id="b")
+        recorder.close()
+        self.assertFalse(recorder.wait(0))
+
+        result = recorder.result(concurrency=2, rate=5.0)
+        self.assertEqual(result.sent, 3)
+        self.assertEqual(result.succeeded, 1)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(result.unfinished, 1)
+        self.assertEqual(result.error_rate, 0.5)
+
+
+class TestLoadHarnessSmoke(unittest.TestCase):
+    """Runs a tiny scenario end to end on the in-memory broker"""
+
+    def setUp(self):
+        self.app = app
+        saved = {
+            key: app.conf[key]
+            for key in (
+                "broker_url",
+                "broker_transport_options",
+                "worker_prefetch_multiplier",
+            )
+        }
+        self.addCleanup(app.conf.update, saved)
+        use_broker(app, "memory://")
+
+    def test_run_scenario(self):
+        """Test that every sent task completes and invalid payloads fail"""
+        with patch(
+            "src.tasks.certification.generate_certificate_2025",
+            make_render_stub(0.01),
+        ):
+            result = run_scenario(
+                self.app,
+                concurrency=2,
+                rate=20.0,
+                duration=0.5,
+                mix={"short": 1, "invalid": 1},
+                drain_timeout=10.0,
+                seed=3,
+            )
+
+        self.assertGreater(result.sent, 0)
+        self.assertEqual(result.unfinished, 0)
+        self.assertEqual(result.succeeded + result.failed, result.sent)
+        self.assertGreater(result.failed, 0)
+        self.assertGreater(result.succeeded, 0)
+        self.assertLess(result.p99, 1.0)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+import time
+import unittest
+import threading
+import multiprocessing
+
+from PIL import Image
+
+from src.tasks.memory import (
+    CanvasPool,
+    MemoryBudget,
+    estimate_render_bytes,
+    rss_bytes,
+    track_render_memory,
+)
+
+MiB = 1024 * 1024
+
+
+def hold_reservation(budget, nbytes, held, release):
+    with budget.reserve(nbytes):
+        held.set()
+        release.wait(5)
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """Unit tests for render admission control"""
+
+    def test_reserve_releases_on_exit(self):
+        """Test that reserved memory is returned after the block"""
+        budget = MemoryBudget(100 * MiB)
+        with budget.reserve(60 * MiB):
+            self.assertEqual(budget.in_use, 60 * MiB)
+        self.assertEqual(budget.in_use, 0)
+
+    def test_reserve_rounds_up_to_units(self):
+        """Test that partial MiB are reserved as whole units"""
+        budget = MemoryBudget(100 * MiB)
+        with budget.reserve(MiB + 1):
+            self.assertEqual(budget.in_use, 2 * MiB)
+
+    def test_oversize_render_is_admitted_alone(self):
+        """Test that a render larger than the budget does not block forever"""
+        budget = MemoryBudget(100 * MiB)
+        with budget.reserve(500 * MiB):
+            self.assertEqual(budget.in_use, 100 * MiB)
+
+    def test_reserve_blocks_until_memory_is_free(self):
+        """Test that a second render waits for the first to release memory"""
+        budget = MemoryBudget(100 * MiB)
+        admitted = threading.Event()
+
+        def second_render():
+            with budget.reserve(60 * MiB):
+                admitted.set()
+
+        with budget.reserve(60 * MiB):
+            worker = threading.Thread(target=second_render)
+            worker.start()
+            time.sleep(0.05)
+            self.assertFalse(admitted.is_set())
+        worker.join(timeout=1)
+        self.assertTrue(admitted.is_set())
+
+    def test_budget_is_shared_with_forked_children(self):
+        """Test that a prefork child's reservation blocks the parent"""
+        context = multiprocessing.get_context("fork")
+        budget = MemoryBudget(100 * MiB, timeout=0.1)
+        held, release = context.Event(), context.Event()
+        child = context.Process(
+            target=hold_reservation, args=(budget, 60 * MiB, held, release)
+        )
+        child.start()
+        try:
+            self.assertTrue(held.wait(5))
+            self.assertEqual(budget.in_use, 60 * MiB)
+            # Times out waiting, so it is admitted with only the free 40 MiB
+            self.assertEqual(budget._acquire(60), 40)
+            for _ in range(40):
+                budget._free.release()
+        finally:
+            release.set()
+            child.join(5)
+        self.assertEqual(budget.in_use, 0)
+
+    def test_estimate_render_bytes(self):
+        """Test the estimate covers the canvas and its encode buffer"""
+        self.assertEqual(estimate_render_bytes((10, 10)), 600)
+
+
+class TestCanvasPool(unittest.TestCase):
+    """Unit tests for canvas reuse"""
+
+    def setUp(self):
+        self.template = Image.new("RGB", (8, 4), "white")
+
+    def test_canvas_is_reused_and_reset(self):
+        """Test that a returned canvas is handed out again with the template restored"""
+        pool = CanvasPool()
+        with pool.canvas(self.template) as first:
+            first.putpixel((0, 0), (0, 0, 0))
+        with pool.canvas(self.template) as second:
+            self.assertIs(second, first)
+            self.assertEqual(second.getpixel((0, 0)), (255, 255, 255))
+
+    def test_concurrent_renders_get_separate_canvases(self):
+        """Test that a canvas in use is not handed out twice"""
+        pool = CanvasPool()
+        with pool.canvas(self.template) as first, pool.canvas(self.template) as second:
+            self.assertIsNot(first, second)
+
+    def test_template_size_change(self):
+        """Test that a canvas of the wrong size is not reused"""
+        pool = CanvasPool()
+        with pool.canvas(self.template):
+            pass
+        with pool.canvas(Image.new("RGB", (16, 8))) as canvas:
+            self.assertEqual(canvas.size, (16, 8))
+
+    def test_idle_canvases_are_bounded(self):
+        """Test that at most `max_idle` canvases are kept"""
+        pool = CanvasPool(max_idle=1)
+        with pool.canvas(self.template), pool.canvas(self.template):
+            pass
+        self.assertEqual(len(pool._idle), 1)
+
+
+class TestTrackRenderMemory(unittest.TestCase):
+    """Unit tests for per-render memory tracking"""
+
+    def test_peak_is_measured_per_render(self):
+        """Test that each render reports its own peak, not the process high-water mark"""
+        for _ in range(2):
+            with track_render_memory("test", interval=0.001) as stats:
+                block = bytearray(64 * MiB)
+                time.sleep(0.05)
+                del block
+            self.assertGreaterEqual(stats["peak_growth"], 32 * MiB)
+            self.assertGreaterEqual(stats["peak_rss"], stats["rss_before"])
+            self.assertGreater(stats["duration"], 0)
+
+    def test_rss_bytes(self):
+        """Test that the current RSS is readable"""
+        self.assertGreater(rss_bytes(), 0)
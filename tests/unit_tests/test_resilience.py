@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import unittest
+from unittest.mock import patch
+
+from src.tasks.errors import (
+    CircuitOpenError,
+    MissingFieldError,
+    StorageUnavailableError,
+    TemplateNotFoundError,
+    is_retryable,
+)
+from src.tasks.resilience import CircuitBreaker, RetryBudget
+
+
+class TestErrorTaxonomy(unittest.TestCase):
+    """Unit tests for retryable vs permanent classification"""
+
+    def test_permanent_errors(self):
+        """Test that deterministic failures are not retried"""
+        self.assertFalse(is_retryable(MissingFieldError("name")))
+        self.assertFalse(is_retryable(TemplateNotFoundError("template")))
+        self.assertFalse(is_retryable(KeyError("unexpected")))
+
+    def test_retryable_errors(self):
+        """Test that backend outages are retried"""
+        self.assertTrue(is_retryable(StorageUnavailableError("down")))
+        self.assertTrue(is_retryable(CircuitOpenError("storage", 10)))
+        self.assertTrue(is_retryable(ConnectionResetError()))
+
+    def test_permanent_errors_keep_builtin_bases(self):
+        """Test that existing `except ValueError` handlers still match"""
+        self.assertIsInstance(MissingFieldError("name"), ValueError)
+        self.assertIsInstance(TemplateNotFoundError("template"), FileNotFoundError)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Unit tests for CircuitBreaker"""
+
+    def setUp(self):
+        self.breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+
+    def fail(self):
+        with self.assertRaises(StorageUnavailableError):
+            with self.breaker.guard((ConnectionError,), StorageUnavailableError):
+                raise ConnectionError("refused")
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the circuit"""
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.check()
+
+    def test_unrelated_errors_do_not_count(self):
+        """Test that non-backend exceptions pass through untouched"""
+        with self.assertRaises(KeyError):
+            with self.breaker.guard((ConnectionError,), StorageUnavailableError):
+                raise KeyError("name")
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_half_open_probe(self):
+        """Test that a successful probe after the timeout closes the circuit"""
+        with patch("src.tasks.resilience.time.monotonic", return_value=100.0):
+            self.fail()
+            self.fail()
+        with patch("src.tasks.resilience.time.monotonic", return_value=131.0):
+            self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+            with self.breaker.guard((ConnectionError,), StorageUnavailableError):
+                pass
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestRetryBudget(unittest.TestCase):
+    """Unit tests for RetryBudget"""
+
+    def test_minimum_retries_allowed(self):
+        """Test that a quiet task type can still retry"""
+        budget = RetryBudget(ratio=0.1, minimum=2)
+        self.assertTrue(budget.try_spend())
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+
+    def test_budget_scales_with_attempts(self):
+        """Test that retries are capped at a fraction of attempts"""
+        budget = RetryBudget(ratio=0.5, minimum=0)
+        for _ in range(4):
+            budget.record_attempt()
+        self.assertTrue(budget.try_spend())
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+
+    def test_ratio_limits_a_busy_child(self):
+        """Test that at one child's render rate the ratio, not the floor, caps retries"""
+        # About a minute of renders in one prefork child
+        budget = RetryBudget(ratio=0.1)
+        for _ in range(60):
+            budget.record_attempt()
+        spent = 0
+        while budget.try_spend():
+            spent += 1
+        self.assertEqual(spent, 6)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+import time
+import unittest
+import threading
+from unittest.mock import patch
+
+from celery.contrib.testing.worker import start_worker
+from celery.signals import task_failure, task_retry, task_success
+
+from main import app
+from src.tasks import resilience
+from src.tasks.errors import StorageUnavailableError
+from src.tasks.resilience import DLX_QUEUE, storage_breaker
+
+QUEUE = "2025_certification"
+TASK_NAME = "certification.first_tasks"
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestTaskRetries(unittest.TestCase):
+    """Runs certification.first_tasks through an in-process worker on an in-memory broker"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.saved_conf = {
+            key: app.conf[key] for key in ("broker_url", "broker_transport_options")
+        }
+        app.conf.broker_url = "memory://"
+        # Deferred and paused messages cycle within the test's timeouts
+        app.conf.broker_transport_options = {"polling_interval": 0.01}
+        cls.worker_context = start_worker(
+            app,
+            pool="threads",
+            concurrency=1,
+            perform_ping_check=False,
+            loglevel="WARNING",
+        )
+        cls.worker = cls.worker_context.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.worker_context.__exit__(None, None, None)
+        app.conf.update(cls.saved_conf)
+
+    def setUp(self):
+        self.events = []
+        self.finished = threading.Event()
+        task = app.tasks[TASK_NAME]
+        for signal, name in (
+            (task_retry, "retry"),
+            (task_success, "success"),
+            (task_failure, "failure"),
+        ):
+            handler = self.make_handler(name)
+            signal.connect(handler, sender=task, weak=False)
+            self.addCleanup(signal.disconnect, handler, sender=task)
+
+        backoff = patch(
+            "src.tasks.resilience.get_exponential_backoff_interval",
+            lambda **kwargs: 0,
+        )
+        backoff.start()
+        self.addCleanup(backoff.stop)
+        self.addCleanup(self.reset_breaker)
+        self.drain_dead_letters()
+
+    def make_handler(self, name):
+        def handler(**kwargs):
+            self.events.append(name)
+            if name != "retry":
+                self.finished.set()
+
+        return handler
+
+    def reset_breaker(self):
+        storage_breaker.record_success()
+        resilience._pause_requests.clear()
+
+    def drain_dead_letters(self):
+        with app.connection_for_write() as conn:
+            DLX_QUEUE(conn.default_channel).declare()
+            DLX_QUEUE(conn.default_channel).purge()
+
+    def get_dead_letter(self):
+        with app.connection_for_read() as conn:
+            return DLX_QUEUE(conn.default_channel).get(no_ack=True)
+
+    def wait_for_dead_letter(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            message = self.get_dead_letter()
+            if message is not None:
+                return message
+            time.sleep(0.02)
+        return None
+
+    def send(self, **payload):
+        payload.setdefault("certificate_name", "Membership")
+        app.tasks[TASK_NAME].apply_async(kwargs=payload)
+
+    def test_retryable_failure_is_retried(self):
+        """Test that a ConnectionError is retried and the retry succeeds"""
+        calls = []
+
+        def flaky_render(data):
+            calls.append(data)
+            if len(calls) == 1:
+                raise ConnectionError("storage refused connection")
+            return "certificate.png"
+
+        with patch("src.tasks.certification.generate_certificate_2025", flaky_render):
+            self.send(name="Jane Doe")
+            self.assertTrue(self.finished.wait(10))
+
+        self.assertEqual(self.events, ["retry", "success"])
+        self.assertEqual(len(calls), 2)
+        self.assertIsNone(self.get_dead_letter())
+
+    def test_permanent_failure_is_dead_lettered(self):
+        """Test that a missing name goes straight to the DLX with its reason"""
+        self.send()
+        self.assertTrue(self.finished.wait(10))
+        self.assertEqual(self.events, ["failure"])
+
+        message = self.wait_for_dead_letter()
+        self.assertIsNotNone(message)
+        self.assertEqual(message.headers["x-failure-reason"], "permanent failure")
+        self.assertIn("MissingFieldError", message.headers["x-exception"])
+        self.assertEqual(message.payload["kwargs"], {"certificate_name": "Membership"})
+
+    def test_worker_does_not_consume_dead_letters(self):
+        """Test that the DLX queue is not one of the worker's task queues"""
+        consumer = self.worker.consumer.task_consumer
+        self.assertTrue(consumer.consuming_from(QUEUE))
+        self.assertFalse(consumer.consuming_from(DLX_QUEUE.name))
+
+    def test_open_storage_breaker_pauses_consumption(self):
+        """Test that a tripped storage breaker pauses the queue until it resets"""
+        calls = []
+
+        def failing_render(data):
+            calls.append(data)
+            if len(calls) == 1:
+                with storage_breaker.guard((OSError,), StorageUnavailableError):
+                    raise OSError("output volume unavailable")
+            return "certificate.png"
+
+        consumer = self.worker.consumer.task_consumer
+        with (
+            patch.object(storage_breaker, "failure_threshold", 1),
+            patch.object(storage_breaker, "reset_timeout", 1.0),
+            patch("src.tasks.certification.generate_certificate_2025", failing_render),
+        ):
+            self.send(name="Jane Doe")
+            self.assertTrue(wait_for(lambda: not consumer.consuming_from(QUEUE)))
+            self.assertTrue(wait_for(lambda: consumer.consuming_from(QUEUE)))
+            self.assertTrue(self.finished.wait(10))
+
+        self.assertEqual(self.events, ["retry", "success"])
+
+    def test_breaker_refusals_do_not_count_as_retries(self):
+        """Test that a message refused for longer than max_retries reset cycles still runs"""
+        task = app.tasks[TASK_NAME]
+        renders = []
+        outage_over = threading.Event()
+
+        def keep_storage_down():
+            # Another worker's failures keep re-opening the circuit
+            while not outage_over.wait(0.05):
+                storage_breaker.record_failure()
+
+        with (
+            patch.object(task, "max_retries", 1),
+            patch.object(storage_breaker, "failure_threshold", 1),
+            patch.object(storage_breaker, "reset_timeout", 0.2),
+            patch(
+                "src.tasks.certification.generate_certificate_2025",
+                lambda data: renders.append(data) or "certificate.png",
+            ),
+        ):
+            storage_breaker.record_failure()
+            outage = threading.Thread(target=keep_storage_down, daemon=True)
+            outage.start()
+            self.addCleanup(outage_over.set)
+            self.send(name="Jane Doe")
+            # Refusals are re-sent every 0.2s, well over max_retries times
+            self.assertTrue(wait_for(lambda: self.events.count("retry") > 3))
+            outage_over.set()
+            outage.join()
+            self.assertTrue(self.finished.wait(10))
+
+        self.assertEqual(self.events[-1], "success")
+        self.assertNotIn("failure", self.events)
+        self.assertEqual(len(renders), 1)
+        self.assertIsNone(self.get_dead_letter())